@@ -0,0 +1,190 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score, log_loss, brier_score_loss
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import game_store
+from feature_engineering import MODEL_FEATURES
+from model_trainer import BASE_MODEL_SPECS, META_PARAMS
+from training_scheduler import make_estimator, mp_context
+
+# estimators that see raw features (split finding is invariant to the scaler)
+TREE_MODELS = {"XGBClassifier", "RandomForestClassifier"}
+
+
+def walk_forward_periods(dates, freq="W", min_train_rows=2000):
+    """
+    (start, end) test periods covering `dates`: "W" (Monday-based weeks),
+    "M" (calendar months) or "season" (one per ESPN season). Periods start
+    once at least `min_train_rows` rows are dated before them.
+    """
+    dates = pd.Series(pd.to_datetime(dates)).sort_values(ignore_index=True)
+    stop = dates.iloc[-1].normalize() + pd.Timedelta(days=1)
+    if freq == "season":
+        starts = dates.groupby(game_store.season_of(dates), sort=True).min().sort_values()
+        edges = [d.normalize() for d in starts] + [stop]
+    elif freq == "W":
+        first = dates.iloc[0].normalize() - pd.Timedelta(days=dates.iloc[0].weekday())
+        edges = list(pd.date_range(first, stop + pd.Timedelta(days=7), freq="7D"))
+    elif freq == "M":
+        first = dates.iloc[0].normalize().replace(day=1)
+        edges = list(pd.date_range(first, stop + pd.offsets.MonthBegin(1), freq="MS"))
+    else:
+        raise ValueError(f"Unsupported backtest frequency: {freq}")
+    values = dates.to_numpy()
+    periods = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        n_train = np.searchsorted(values, np.datetime64(start), side="left")
+        n_test = np.searchsorted(values, np.datetime64(end), side="left") - n_train
+        if n_train >= min_train_rows and n_test > 0:
+            periods.append((pd.Timestamp(start), pd.Timestamp(end)))
+    return periods
+
+
+def _base_predictions(X, y, dates, periods, specs, window, warm_start, warm_rounds, forest_refresh,
+                      refit_every, n_jobs):
+    """
+    Fit the base models for a contiguous run of periods and predict each
+    period's rows. Between full refits (first period, then every
+    `refit_every`), XGBoost is warm-started from the previous booster with
+    `warm_rounds` extra trees and the random forest swaps its `forest_refresh`
+    oldest trees for new ones grown on the current window.
+    Returns [(start, end, n_train, test_rows, base_preds)].
+    """
+    out = []
+    fitted = {}
+    since_refit = None
+    for start, end in periods:
+        start64, end64 = np.datetime64(start), np.datetime64(end)
+        train = dates < start64
+        if window is not None:
+            train &= dates >= np.datetime64(start - window)
+        test_rows = np.flatnonzero((dates >= start64) & (dates < end64))
+        X_train, y_train, X_test = X[train], y[train], X[test_rows]
+        scaler = StandardScaler().fit(X_train)
+        refit = not warm_start or since_refit is None or since_refit >= refit_every
+        since_refit = 0 if refit else since_refit + 1
+
+        preds = np.empty((len(test_rows), len(specs)))
+        for i, (name, cls, params) in enumerate(specs):
+            if cls.__name__ in TREE_MODELS:
+                fit_X, pred_X = X_train, X_test
+            else:
+                fit_X, pred_X = scaler.transform(X_train), scaler.transform(X_test)
+            model = fitted.get(name)
+            if not refit and cls is xgb.XGBClassifier:
+                booster = model.get_booster()
+                model = make_estimator(cls, {**params, "n_estimators": warm_rounds}, n_jobs)
+                model.fit(fit_X, y_train, xgb_model=booster)
+            elif not refit and cls is RandomForestClassifier and forest_refresh:
+                # grow new trees on this window, then drop the same number of oldest ones
+                model.set_params(warm_start=True, random_state=params.get("random_state", 0) + len(out),
+                                 n_estimators=len(model.estimators_) + forest_refresh)
+                model.fit(fit_X, y_train)
+                model.estimators_ = model.estimators_[forest_refresh:]
+                model.n_estimators = len(model.estimators_)
+            else:
+                model = make_estimator(cls, params, n_jobs)
+                model.fit(fit_X, y_train)
+            fitted[name] = model
+            preds[:, i] = model.predict_proba(pred_X)[:, 1]
+        out.append((start, end, int(train.sum()), test_rows, preds))
+    return out
+
+
+def calibration_error(y_true, probs, bins=10):
+    """Expected calibration error over equal-width probability bins."""
+    edges = np.linspace(0, 1, bins + 1)
+    idx = np.clip(np.digitize(probs, edges[1:-1]), 0, bins - 1)
+    err = 0.0
+    for b in range(bins):
+        mask = idx == b
+        if mask.any():
+            err += mask.mean() * abs(probs[mask].mean() - y_true[mask].mean())
+    return err
+
+
+def period_metrics(y_true, probs):
+    metrics = {
+        "accuracy": accuracy_score(y_true, probs > 0.5),
+        "auc": roc_auc_score(y_true, probs) if len(np.unique(y_true)) == 2 else np.nan,
+        "log_loss": log_loss(y_true, np.clip(probs, 1e-6, 1 - 1e-6), labels=[0, 1]),
+        "brier": brier_score_loss(y_true, probs),
+        "calibration_error": calibration_error(y_true, probs),
+        "mean_pred": float(probs.mean()),
+        "win_rate": float(y_true.mean()),
+    }
+    return metrics
+
+
+def walk_forward_backtest(freq="W", mode="expanding", window_weeks=52, min_train_rows=2000,
+                          warm_start=True, warm_rounds=30, forest_refresh=20, refit_every=10, min_meta_rows=1000,
+                          base_params=None, max_workers=None, feats=None, store_dir=game_store.STORE_DIR):
+    """
+    Walk-forward evaluation of the stacked ensemble.
+    For every test period (`freq`: "W", "M" or "season"), base models are
+    trained on all earlier rows ("expanding") or the last `window_weeks`
+    weeks ("rolling") and predict the period. The meta learner for a period is
+    fit on the base predictions of all earlier periods, which are out-of-sample
+    by construction, so no per-period K-fold refits are needed. Features are
+    loaded once; contiguous chunks of periods run in parallel processes, each
+    warm-starting XGBoost and refreshing the forest along its chunk.
+    Returns one row per period with accuracy/AUC/log-loss/Brier/calibration.
+    """
+    if feats is None:
+        feats = game_store.read_features(store_dir=store_dir)
+        if feats is None:
+            raise FileNotFoundError("No features in the store — build features first.")
+    feats = feats.sort_values("date", kind="stable").reset_index(drop=True)
+    X = feats[MODEL_FEATURES].to_numpy(dtype=float)
+    y = feats["win_flag"].to_numpy(dtype=int)
+    dates = pd.to_datetime(feats["date"]).to_numpy()
+
+    periods = walk_forward_periods(dates, freq, min_train_rows)
+    if not periods:
+        return pd.DataFrame()
+    window = pd.Timedelta(weeks=window_weeks) if mode == "rolling" else None
+    specs = [(name, cls, {**params, **(base_params or {}).get(name, {})})
+             for name, cls, params in BASE_MODEL_SPECS]
+
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(len(periods), max_workers or cpus))
+    n_jobs = max(1, cpus // workers)
+    chunks = [list(c) for c in np.array_split(np.arange(len(periods)), workers) if len(c)]
+    args = (window, warm_start, warm_rounds, forest_refresh, refit_every, n_jobs)
+    print(f"Backtest: {len(periods)} periods ({freq}, {mode}) on {workers} worker(s)")
+    if workers == 1:
+        base = _base_predictions(X, y, dates, periods, specs, *args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context()) as pool:
+            futures = [pool.submit(_base_predictions, X, y, dates, [periods[i] for i in chunk], specs, *args)
+                       for chunk in chunks]
+            base = [row for fut in futures for row in fut.result()]
+
+    # meta learner per period on the accumulated out-of-sample base predictions
+    rows = []
+    meta_X, meta_y = [], []
+    for start, end, n_train, test_rows, preds in base:
+        y_test = y[test_rows]
+        n_meta = sum(len(m) for m in meta_X)
+        if n_meta >= min_meta_rows:
+            meta = xgb.XGBClassifier(**META_PARAMS, n_jobs=cpus)
+            meta.fit(np.vstack(meta_X), np.concatenate(meta_y))
+            probs = meta.predict_proba(preds)[:, 1]
+        else:
+            probs = preds.mean(axis=1)
+        row = {"period_start": start, "period_end": end, "n_train": n_train,
+               "n_test": len(test_rows), "n_meta": n_meta}
+        row.update(period_metrics(y_test, probs))
+        rows.append(row)
+        meta_X.append(preds)
+        meta_y.append(y_test)
+    results = pd.DataFrame(rows)
+    print(f"✅ Backtest done — mean ACC:{results['accuracy'].mean():.3f}  "
+          f"mean log-loss:{results['log_loss'].mean():.3f}")
+    return results
@@ -0,0 +1 @@
+"""Benchmarks for the NBA prediction pipeline (run from the repo root)."""
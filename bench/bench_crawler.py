@@ -0,0 +1,56 @@
+"""
+Wall-clock benchmark: serial requests.get crawl (the old collect_season_data loop)
+vs the pooled, concurrent crawler, both against the local fake ESPN server.
+
+    python -m bench.bench_crawler --seasons-back 0 --latency 0.02
+"""
+import argparse
+import tempfile
+import time
+
+import requests
+
+from data_saver import collect_season_data, season_days, parse_scoreboard
+from bench.fake_espn import FakeESPNServer
+
+
+def serial_crawl(base_url, seasons):
+    """The pre-crawler loop: one fresh requests.get per day, no session reuse."""
+    rows = []
+    for season in seasons:
+        for d in season_days(season):
+            resp = requests.get(f"{base_url}?dates={d}&limit=200&groups=50", timeout=15)
+            if resp.status_code == 200:
+                rows.extend(parse_scoreboard(resp.json(), f"{season}-{season+1}", d))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seasons-back", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args(argv)
+
+    from datetime import datetime
+    this_year = datetime.today().year
+    seasons = list(range(this_year - args.seasons_back, this_year + 1))
+
+    with FakeESPNServer(latency=args.latency) as server:
+        t0 = time.perf_counter()
+        legacy_rows = serial_crawl(server.base_url, seasons)
+        legacy = time.perf_counter() - t0
+        print(f"serial requests.get      : {legacy:7.2f}s  ({len(legacy_rows)} games)")
+
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                t0 = time.perf_counter()
+                df = collect_season_data(args.seasons_back, workers=workers, resume=False,
+                                         base_url=server.base_url, data_dir=tmp)
+                elapsed = time.perf_counter() - t0
+            print(f"crawler workers={workers:<3d}     : {elapsed:7.2f}s  ({len(df)} games)  "
+                  f"speedup x{legacy / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+build_features benchmark: the old per-team rolling loop vs the vectorized
+engine (feature_engineering.compute_features) over the bundled 5-year CSV,
+optionally replicated to longer histories. Also checks both give the same rows.
+
+    python -m bench.bench_features --scale 1 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import compute_features, usable_games
+from bench.bench_store import make_history
+
+
+def legacy_features(df):
+    """The pre-vectorization build_features body (per-team scan + rolling)."""
+    df = df.dropna(subset=["home_score", "away_score"]).reset_index(drop=True)
+    team_stats = []
+    for team in pd.unique(df[["home_team", "away_team"]].values.ravel()):
+        team_games = df[(df["home_team"] == team) | (df["away_team"] == team)].copy()
+        team_games = team_games.sort_values("date")
+        team_games["points_for"] = np.where(team_games["home_team"] == team,
+                                            team_games["home_score"], team_games["away_score"])
+        team_games["points_against"] = np.where(team_games["home_team"] == team,
+                                                team_games["away_score"], team_games["home_score"])
+        team_games["win_flag"] = (team_games["points_for"] > team_games["points_against"]).astype(int)
+        for n in [5, 10]:
+            team_games[f"avg_pts_{n}"] = team_games["points_for"].rolling(n, min_periods=1).mean().shift(1)
+            team_games[f"avg_pa_{n}"] = team_games["points_against"].rolling(n, min_periods=1).mean().shift(1)
+            team_games[f"win_rate_{n}"] = team_games["win_flag"].rolling(n, min_periods=1).mean().shift(1)
+        team_games["is_home"] = (team_games["home_team"] == team).astype(int)
+        team_games["team_name"] = team
+        team_stats.append(team_games)
+    combined = pd.concat(team_stats).sort_values("date").reset_index(drop=True)
+    combined = combined.dropna().reset_index(drop=True)
+    feature_cols = [
+        "date", "team_name", "is_home", "avg_pts_5", "avg_pa_5", "win_rate_5",
+        "avg_pts_10", "avg_pa_10", "win_rate_10", "points_for", "points_against", "win_flag"
+    ]
+    return combined[feature_cols].copy().dropna()
+
+
+def compare(old, new):
+    """Number of feature rows that differ once both frames are put in (date, team, is_home) order."""
+    key = ["date", "team_name", "is_home", "points_for", "points_against"]
+    old = old.sort_values(key, kind="stable").reset_index(drop=True)
+    new = new.sort_values(key, kind="stable").reset_index(drop=True)
+    if len(old) != len(new):
+        return abs(len(old) - len(new))
+    num = old.columns.drop(["date", "team_name"])
+    same = np.isclose(old[num].to_numpy(float), new[num].to_numpy(float), rtol=0, atol=1e-12).all(axis=1)
+    same &= (old["team_name"].to_numpy() == new["team_name"].to_numpy())
+    return int((~same).sum())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="per-team loop vs vectorized build_features")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for scale in args.scale:
+        games = usable_games(make_history(scale))
+        games["date"] = games["date"].astype(int)
+        timings = {}
+        for name, fn in [("per-team loop", legacy_features), ("vectorized", compute_features)]:
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                out = fn(games)
+                best = min(best, time.perf_counter() - t0)
+            timings[name] = (best, out)
+        (t_old, f_old), (t_new, f_new) = timings["per-team loop"], timings["vectorized"]
+        print(f"{len(games):7d} games: loop {t_old * 1000:8.1f}ms  vectorized {t_new * 1000:7.1f}ms  "
+              f"speedup x{t_old / t_new:5.1f}  rows {len(f_new)}  differing rows {compare(f_old, f_new)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Parse-throughput benchmark for ESPN scoreboard payloads: the previous
+per-call-site loop (json.loads -> list-comprehension home/away scans -> dict
+rows -> DataFrame) vs espn_parser (single competitor scan -> GameRow tuples ->
+DataFrame), with the stdlib decoder and with orjson when it is installed.
+Payloads come from bench/fixtures/*.json: full-size scoreboards in ESPN's
+response layout (team links, linescores, statistics, leaders, broadcasts).
+
+    python -m bench.bench_parser --repeat 200
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+
+import espn_parser
+from espn_parser import games_frame, iter_games
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def legacy_parse(raw, season_label, date_str):
+    """The loop previously copied into data_fetcher and data_saver."""
+    rows = []
+    for evt in json.loads(raw).get("events", []):
+        try:
+            comp = evt["competitions"][0]
+            home = [t for t in comp["competitors"] if t["homeAway"] == "home"][0]
+            away = [t for t in comp["competitors"] if t["homeAway"] == "away"][0]
+            rows.append({
+                "season": season_label,
+                "date": date_str,
+                "home_team": home["team"]["displayName"],
+                "away_team": away["team"]["displayName"],
+                "home_score": home.get("score", 0),
+                "away_score": away.get("score", 0),
+                "status": evt["status"]["type"]["description"]
+            })
+        except Exception:
+            continue
+    return rows
+
+
+def _run(payloads, repeat, parse):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = []
+        for raw in payloads:
+            out.extend(parse(raw))
+        frame = pd.DataFrame(out) if out and isinstance(out[0], dict) else games_frame(out)
+    return time.perf_counter() - t0, frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ESPN scoreboard parse throughput")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "scoreboard_*.json"))):
+        with open(path, "rb") as fh:
+            payloads.append(fh.read())
+    n_bytes = sum(len(p) for p in payloads)
+    n_events = sum(len(json.loads(p)["events"]) for p in payloads)
+    print(f"{len(payloads)} fixtures, {n_events} events, {n_bytes / 1024:.0f} KB per pass, {args.repeat} passes")
+
+    cases = [
+        ("legacy (json + dict rows)", lambda raw: legacy_parse(raw, "2024-2025", "20250115")),
+        ("espn_parser (json)", lambda raw: iter_games(json.loads(raw), "2024-2025", "20250115")),
+    ]
+    if espn_parser.orjson is not None:
+        cases.append(("espn_parser (orjson)",
+                      lambda raw: iter_games(espn_parser.orjson.loads(raw), "2024-2025", "20250115")))
+    else:
+        print("orjson not installed — skipping the orjson case")
+
+    reference = None
+    for name, parse in cases:
+        seconds, frame = _run(payloads, args.repeat, parse)
+        cols = ["home_team", "away_team", "home_score", "away_score", "status"]
+        frame = frame[cols].astype(str)
+        same = reference is None or frame.equals(reference)
+        reference = frame if reference is None else reference
+        print(f"{name:<28} {args.repeat * n_events / seconds:10.0f} events/s  "
+              f"{args.repeat * n_bytes / seconds / 2**20:7.1f} MB/s  same rows: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Rating-engine benchmark on the bundled 5-season CSV: one streaming pass of
+ratings.pregame_ratings (Elo with home-court / margin-of-victory adjustment,
+with and without the per-date Massey refit), the rating share of
+compute_features, and an incremental update of a persisted RatingState.
+Also checks that live rating features (TeamState.matchup_features as of a
+game date) equal the batch ones, on every season opener and mid-season dates.
+
+    python -m bench.bench_ratings --repeat 5
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import add_rolling_features, compute_features, team_game_table, usable_games
+from game_store import season_start
+from ratings import RATING_FEATURES, RatingState, pregame_ratings
+from team_state import TeamState
+
+BUNDLED_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "nba_games_5yr.csv")
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def live_batch_gap(games, feats, date):
+    """Largest |live - batch| per rating feature for the games on `date` (state built from earlier games)."""
+    when = pd.Timestamp(str(date))
+    state = TeamState()
+    state.update_from_games(games, cutoff=when)
+    day = games[games["date"] == date]
+    live = state.matchup_features(day["home_team"], day["away_team"], as_of=when)
+    live["team_name"] = list(day["home_team"]) + list(day["away_team"])
+    live["is_home"] = [1] * len(day) + [0] * len(day)
+    batch = feats[feats["date"] == date]
+    both = live.merge(batch, on=["team_name", "is_home"], suffixes=("_live", ""))
+    return {c: float(np.abs(both[f"{c}_live"] - both[c]).max()) if len(both) else 0.0 for c in RATING_FEATURES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Elo / Massey rating engine benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    games = usable_games(pd.read_csv(BUNDLED_CSV))
+    print(f"{len(games)} final games, {games['date'].nunique()} dates")
+
+    t_elo, _ = _best(lambda: pregame_ratings(games, RatingState(massey=False)), args.repeat)
+    t_full, (ratings, state) = _best(lambda: pregame_ratings(games), args.repeat)
+    t_rolling, _ = _best(lambda: add_rolling_features(team_game_table(games)), args.repeat)
+    t_features, _ = _best(lambda: compute_features(games), args.repeat)
+    print(f"Elo pass                {t_elo * 1000:8.1f} ms")
+    print(f"Elo + Massey pass       {t_full * 1000:8.1f} ms  ({len(games) / t_full:,.0f} games/s)")
+    print(f"compute_features        {t_features * 1000:8.1f} ms  (rolling only: {t_rolling * 1000:.1f} ms)")
+
+    # persisted state picking up the last week of games incrementally
+    last = pd.to_datetime(games["date"].astype(str), format="%Y%m%d")
+    recent = last >= last.max() - pd.Timedelta(days=7)
+    _, older = pregame_ratings(games[~recent])
+    blob = json.dumps(older.to_dict())
+    t_inc, _ = _best(lambda: pregame_ratings(games[recent], RatingState.from_dict(json.loads(blob))), args.repeat)
+    _, resumed = pregame_ratings(games[recent], RatingState.from_dict(json.loads(blob)))
+    same = all(abs(resumed.elo[t] - state.elo[t]) < 1e-9 for t in state.elo)
+    print(f"load state + {int(recent.sum())} new games {t_inc * 1000:6.1f} ms  (matches full pass: {same})")
+
+    # live vs batch rating features: every season opener, plus a mid-season date per season
+    dates = pd.Series(sorted(games["date"].unique()))
+    seasons = dates.map(lambda d: season_start(str(d)))
+    openers = dates.groupby(seasons).first()
+    mid = dates.groupby(seasons).apply(lambda d: d.iloc[len(d) // 2])
+    feats = compute_features(games)
+    for label, checks in (("season opener", openers), ("mid-season", mid)):
+        for date in checks:
+            gap = live_batch_gap(games, feats, date)
+            worst = max(gap.values())
+            print(f"live vs batch {label:<13} {pd.Timestamp(str(date)):%Y-%m-%d}  max |diff| {worst:.2e}"
+                  + ("" if worst < 1e-6 else "  ⚠️ " + ", ".join(f"{k} {v:.3g}" for k, v in gap.items() if v >= 1e-6)))
+
+
+if __name__ == "__main__":
+    main()
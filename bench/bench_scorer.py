@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of the stacked-ensemble scoring paths: the reference
+scaler -> 3x predict_proba -> meta path vs fast_scorer.FusedScorer, for batch
+sizes from a single matchup up to a full season of simulated matchups
+(1230 games, two team rows each). Models are trained on the bundled data into
+a temporary directory unless --models-dir points at an existing model set.
+
+    python -m bench.bench_scorer --sizes 1 10 100 1000 2460
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from fast_scorer import FusedScorer
+from feature_engineering import MODEL_FEATURES
+from model_predictor import stacked_proba
+from model_registry import ModelRegistry
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run(models_dir, sizes, repeat):
+    import game_store
+    models, scaler = ModelRegistry(models_dir).get()
+    scorer = FusedScorer(models, scaler)
+    pool = game_store.read_features(columns=MODEL_FEATURES)[MODEL_FEATURES].to_numpy(float)
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>6} {'reference':>12} {'fused':>10} {'speedup':>8} {'max |diff|':>11}")
+    for size in sizes:
+        X = pool[rng.integers(0, len(pool), size)]
+        t_ref, p_ref = _best(lambda: stacked_proba(models, scaler, X), repeat)
+        t_fast, p_fast = _best(lambda: scorer.predict_proba(X), repeat)
+        diff = float(np.max(np.abs(p_ref - p_fast)))
+        print(f"{size:6d} {t_ref * 1000:10.2f}ms {t_fast * 1000:8.2f}ms {t_ref / t_fast:7.1f}x {diff:11.2e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="reference vs fused ensemble scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 2460])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args(argv)
+    if args.models_dir:
+        run(args.models_dir, args.sizes, args.repeat)
+        return
+    from model_trainer import build_features, train_stacked_model
+    with tempfile.TemporaryDirectory() as tmp:
+        build_features()
+        train_stacked_model(models_dir=tmp)
+        run(tmp, args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
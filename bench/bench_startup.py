@@ -0,0 +1,117 @@
+"""
+Startup benchmark for streamlit_app: every run is a fresh interpreter that
+renders the app once through streamlit.testing (cold start: imports, poller
+start, first ESPN fetches, team-state and model loads) and then reruns it
+(warm rerun, as after any widget interaction). ESPN is the local fake server
+(via the ESPN_SCOREBOARD_URL environment variable), so only local work and
+loopback round trips are timed. Each run gets its own copy of the game store
+in a temporary NBA_DATA_DIR (team state prebuilt, empty scoreboard cache), so
+the fake boards never reach the real data/ directory. The app's own section
+timings are printed when it records them in st.session_state["page_timing"].
+
+    python -m bench.bench_startup --runs 3 --reruns 3
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.fake_espn import FakeESPNServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+RESULT_PREFIX = "STARTUP_RESULT "
+HEAVY_MODULES = ["xgboost", "sklearn", "model_trainer", "backtest"]
+
+
+def child(reruns):
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    harness = time.perf_counter() - t0
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+    # the poller imports the models in its own thread; this is what the script run itself pulled in
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    cold_sections = dict(at.session_state["page_timing"]) if "page_timing" in at.session_state else {}
+
+    warm = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - t0)
+    warm_sections = dict(at.session_state["page_timing"]) if "page_timing" in at.session_state else {}
+    print(RESULT_PREFIX + json.dumps({
+        "harness": harness, "cold": cold, "warm": warm, "heavy_after_cold": loaded,
+        "exception": [str(e.value) for e in at.exception],
+        "cold_sections": cold_sections, "warm_sections": warm_sections,
+    }))
+
+
+def make_template(root):
+    """Scratch data dir holding a copy of the real game store and a team state built from it."""
+    import game_store
+    from team_state import load_team_state
+    data_dir = os.path.join(root, "template")
+    os.makedirs(data_dir)
+    if os.path.isdir(game_store.STORE_DIR):
+        shutil.copytree(game_store.STORE_DIR, os.path.join(data_dir, "store"))
+    if os.path.exists(game_store.LEGACY_GAMES_CSV):
+        shutil.copy2(game_store.LEGACY_GAMES_CSV, data_dir)
+    load_team_state(path=os.path.join(data_dir, "team_state.json"), store_dir=os.path.join(data_dir, "store"))
+    return data_dir
+
+
+def run_once(base_url, reruns, template):
+    data_dir = os.path.join(os.path.dirname(template), f"run-{time.monotonic_ns()}")
+    shutil.copytree(template, data_dir)
+    env = {**os.environ, "ESPN_SCOREBOARD_URL": base_url, "NBA_DATA_DIR": data_dir}
+    proc = subprocess.run([sys.executable, "-m", "bench.bench_startup", "--child", "--reruns", str(reruns)],
+                          cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"startup run failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="streamlit_app cold start / warm rerun timing")
+    parser.add_argument("--runs", type=int, default=3, help="fresh-process runs")
+    parser.add_argument("--reruns", type=int, default=3, help="warm reruns per process")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake ESPN round trip (s)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.reruns)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp, FakeESPNServer(latency=args.latency) as server:
+        template = make_template(tmp)
+        results = [run_once(server.base_url, args.reruns, template) for _ in range(args.runs)]
+
+    cold = [r["cold"] for r in results]
+    warm = [t for r in results for t in r["warm"]]
+    print(f"{args.runs} process(es), {args.reruns} warm rerun(s) each, fake ESPN latency {args.latency * 1000:.0f} ms")
+    print(f"streamlit.testing import {statistics.median(r['harness'] for r in results):6.2f} s (harness, not counted)")
+    print(f"cold start   median {statistics.median(cold):6.2f} s   min {min(cold):6.2f} s")
+    print(f"warm rerun   median {statistics.median(warm):6.2f} s   min {min(warm):6.2f} s")
+    print(f"heavy modules after the cold run: {', '.join(results[-1]['heavy_after_cold']) or 'none'}")
+    for label in ("cold_sections", "warm_sections"):
+        sections = results[-1][label]
+        if sections:
+            print(f"{label.split('_')[0]} sections: " + " · ".join(f"{k} {v:.0f} ms" for k, v in sections.items()))
+    errors = results[-1]["exception"]
+    if errors:
+        print(f"⚠️ app raised: {errors}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Load-time / peak-memory benchmark: flat CSV (pd.read_csv) vs the parquet game store.
+The bundled 5-season CSV is replicated into `--scale` copies shifted by 8 years each
+(keeps Feb 29 valid) so larger histories can be compared. Every case runs in a fresh
+interpreter and peak RSS is measured over the load call only (Linux VmHWM reset).
+
+    python -m bench.bench_store --scale 1 4 16
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from bench.memory import reset_peak_rss, status_mb
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_CSV = os.path.join(REPO_DIR, "data", "nba_games_5yr.csv")
+
+
+def make_history(scale):
+    """Bundled games repeated `scale` times, each copy shifted back 8 more years."""
+    base = pd.read_csv(BUNDLED_CSV, dtype={"date": str})
+    copies = []
+    for k in range(scale):
+        part = base.copy()
+        years = part["date"].str[:4].astype(int) - 8 * k
+        part["date"] = years.astype(str) + part["date"].str[4:]
+        start = part["season"].str[:4].astype(int) - 8 * k
+        part["season"] = start.astype(str) + "-" + (start + 1).astype(str)
+        copies.append(part)
+    return pd.concat(copies[::-1], ignore_index=True)
+
+
+def _run_case(case, path):
+    """Executed in a child interpreter; prints a JSON result line."""
+    import game_store
+    reset_peak_rss()
+    base_rss = status_mb("VmRSS")
+    t0 = time.perf_counter()
+    if case == "csv":
+        df = pd.read_csv(path)
+    elif case == "store":
+        df = game_store.read_games(store_dir=path)
+    elif case == "store_one_season":
+        last = sorted(os.listdir(os.path.join(path, game_store.GAMES)))[-1].split("=", 1)[1]
+        df = game_store.read_games(seasons=[last], store_dir=path)
+    elif case == "store_date_range":
+        df = game_store.read_games(start_date="2024-01-01", end_date="2024-03-31", store_dir=path)
+    else:
+        raise ValueError(case)
+    elapsed = time.perf_counter() - t0
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+    print(json.dumps({"case": case, "rows": len(df), "seconds": elapsed,
+                      "peak_rss_delta_mb": status_mb("VmHWM") - base_rss, "frame_mb": frame_mb}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV vs parquet game store load benchmark")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args(argv)
+
+    import game_store
+    for scale in args.scale:
+        games = make_history(scale)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "games.csv")
+            games.to_csv(csv_path, index=False)
+            game_store.write_games(games, tmp)
+            print(f"--- {len(games)} games ({5 * scale} seasons) ---")
+            for case in ["csv", "store", "store_one_season", "store_date_range"]:
+                path = csv_path if case == "csv" else tmp
+                out = subprocess.run(
+                    [sys.executable, "-m", "bench.bench_store", "--case", case, path],
+                    cwd=REPO_DIR, capture_output=True, text=True, check=True,
+                ).stdout.strip().splitlines()[-1]
+                r = json.loads(out)
+                print(f"{r['case']:<18} rows={r['rows']:<7d} load={r['seconds'] * 1000:7.1f}ms  "
+                      f"peak RSS +{r['peak_rss_delta_mb']:6.1f}MB  frame={r['frame_mb']:5.2f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--case":
+        _run_case(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,137 @@
+"""
+Local stand-in for the ESPN scoreboard API.
+Serves deterministic synthetic games in the same JSON shape as
+/apis/site/v2/sports/basketball/nba/scoreboard?dates=YYYYMMDD,
+with optional per-request latency to mimic a real round trip.
+"""
+import json
+import random
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SCOREBOARD_PATH = "/apis/site/v2/sports/basketball/nba/scoreboard"
+
+TEAMS = [
+    "Atlanta Hawks", "Boston Celtics", "Brooklyn Nets", "Charlotte Hornets",
+    "Chicago Bulls", "Cleveland Cavaliers", "Dallas Mavericks", "Denver Nuggets",
+    "Detroit Pistons", "Golden State Warriors", "Houston Rockets", "Indiana Pacers",
+    "LA Clippers", "Los Angeles Lakers", "Memphis Grizzlies", "Miami Heat",
+    "Milwaukee Bucks", "Minnesota Timberwolves", "New Orleans Pelicans", "New York Knicks",
+    "Oklahoma City Thunder", "Orlando Magic", "Philadelphia 76ers", "Phoenix Suns",
+    "Portland Trail Blazers", "Sacramento Kings", "San Antonio Spurs", "Toronto Raptors",
+    "Utah Jazz", "Washington Wizards",
+]
+
+
+def games_for_day(date_str, teams=TEAMS, today_str=None):
+    """Deterministic slate for one date: up to len(teams)//2 games, none in the off-season."""
+    day = datetime.strptime(date_str, "%Y%m%d")
+    if day.month in (8, 9) or (day.month == 7 and day.day > 1):
+        return []
+    rng = random.Random(f"{date_str}|{len(teams)}|{teams[0]}")
+    picks = rng.sample(teams, len(teams))
+    n_games = rng.randint(0, len(teams) // 2)
+    final = today_str is None or date_str < today_str
+    games = []
+    for i in range(n_games):
+        home, away = picks[2 * i], picks[2 * i + 1]
+        home_score = rng.randint(90, 135)
+        away_score = rng.randint(88, 132)
+        if home_score == away_score:
+            home_score += 1
+        games.append({
+            "home_team": home, "away_team": away,
+            "home_score": home_score if final else 0,
+            "away_score": away_score if final else 0,
+            "status": "Final" if final else "Scheduled",
+            "start_time": f"{day:%Y-%m-%d}T{19 + i % 4:02d}:30Z",
+        })
+    return games
+
+
+def league_teams(n_leagues, teams=TEAMS):
+    """Team lists for `n_leagues` synthetic leagues; league k > 1 reuses the names with an " L<k>" suffix."""
+    return [list(teams)] + [[f"{t} L{k}" for t in teams] for k in range(2, n_leagues + 1)]
+
+
+def slate_for_day(date_str, leagues, today_str=None):
+    """Every league's games for one date, leagues played side by side on the same scoreboard."""
+    return [g for teams in leagues for g in games_for_day(date_str, teams, today_str)]
+
+
+def scoreboard_payload(games):
+    """Wrap game dicts in the ESPN scoreboard JSON structure."""
+    events = []
+    for g in games:
+        events.append({
+            "date": g["start_time"],
+            "status": {"type": {"description": g["status"]}},
+            "competitions": [{
+                "competitors": [
+                    {"homeAway": "home", "team": {"displayName": g["home_team"]}, "score": str(g["home_score"])},
+                    {"homeAway": "away", "team": {"displayName": g["away_team"]}, "score": str(g["away_score"])},
+                ]
+            }],
+        })
+    return {"events": events}
+
+
+class FakeESPNServer:
+    """
+    Threaded HTTP server on 127.0.0.1 serving synthetic scoreboards.
+    Use as a context manager; `base_url` is the scoreboard endpoint.
+    `leagues` (lists of team names, see league_teams) overrides `teams`.
+    """
+
+    def __init__(self, latency=0.02, teams=TEAMS, today_str=None, leagues=None):
+        self.latency = latency
+        self.teams = teams
+        self.leagues = leagues or [teams]
+        self.today_str = today_str or datetime.today().strftime("%Y%m%d")
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != SCOREBOARD_PATH:
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    threading.Event().wait(server.latency)
+                date_str = parse_qs(url.query).get("dates", [server.today_str])[0]
+                body = json.dumps(scoreboard_payload(
+                    slate_for_day(date_str, server.leagues, server.today_str))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}{SCOREBOARD_PATH}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,23 @@
+"""
+Process memory readings shared by the benchmarks: current / peak RSS from
+/proc/self/status, and a peak reset so a peak covers one measured step only.
+"""
+import resource
+
+
+def status_mb(field):
+    """A /proc/self/status size field ("VmRSS", "VmHWM") in MB (ru_maxrss if the field is absent)."""
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM so the next peak only covers what follows
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
@@ -0,0 +1,281 @@
+"""
+End-to-end pipeline benchmark: collection, build_features, train_stacked_model
+and predict_today against the local fake ESPN server, at several history sizes
+(seasons) and numbers of synthetic leagues. Every (seasons, leagues) scale runs
+in a fresh interpreter with its own temporary data/models directories; each
+stage records wall time, peak RSS (Linux VmHWM reset per stage) and its cProfile
+hot spots. Results are appended to a JSON history file and compared with the
+median of earlier runs on the same machine; a stage slower or bigger than that
+by more than --threshold fails the run (exit code 1).
+
+    python -m bench --seasons 1 5 20 --leagues 1 2
+    python -m bench --seasons 1 --stages features train --threshold 0.5
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from bench.memory import reset_peak_rss, status_mb
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_PATH = os.path.join(REPO_DIR, "bench", "history.json")
+STAGES = ["collect", "features", "train", "predict"]
+RESULT_PREFIX = "BENCH_RESULT "
+# below these floors a relative change is noise, not a regression
+MIN_SECONDS = 0.2
+MIN_RSS_MB = 25.0
+
+
+def _short_path(path):
+    if path.startswith(REPO_DIR):
+        return os.path.relpath(path, REPO_DIR)
+    return path.split("site-packages" + os.sep, 1)[-1]
+
+
+def _hot_spots(profile, top):
+    """The `top` functions by own time as {function, calls, tottime, cumtime}."""
+    stats = pstats.Stats(profile)
+    rows = []
+    for (path, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{_short_path(path)}:{line}({func})",
+            "calls": calls, "tottime": round(tottime, 4), "cumtime": round(cumtime, 4),
+        })
+    rows.sort(key=lambda r: r["tottime"], reverse=True)
+    return rows[:top]
+
+
+# -------------------------------
+# Stages (run in the child interpreter)
+# -------------------------------
+def _stage_collect(ctx):
+    from data_saver import collect_season_data
+    # collect_season_data crawls the current season plus `seasons_back` earlier ones
+    games = collect_season_data(seasons_back=ctx["seasons"] - 1, workers=ctx["workers"], resume=False,
+                                base_url=ctx["base_url"], data_dir=ctx["data_dir"])
+    return len(games)
+
+
+def _stage_features(ctx):
+    from feature_engineering import build_features
+    return len(build_features(store_dir=ctx["store_dir"]))
+
+
+def _stage_train(ctx):
+    import game_store
+    from model_trainer import train_stacked_model
+    train_stacked_model(models_dir=ctx["models_dir"], store_dir=ctx["store_dir"],
+                        use_cache=False, max_workers=ctx["train_workers"])
+    return len(game_store.read_features(columns=["win_flag"], store_dir=ctx["store_dir"]))
+
+
+def _stage_predict(ctx):
+    """Cold predict_today (model + team-state load), then `predict_calls` warm calls."""
+    import pandas as pd
+    import game_store
+    import model_predictor as mp
+    from data_saver import fetch_day, make_session
+    from model_registry import ModelRegistry
+    from team_state import load_team_state
+
+    session = make_session()
+    board = []
+    day = datetime.today()
+    for _ in range(14):
+        d = day.strftime("%Y%m%d")
+        board = fetch_day(session, d, game_store.season_label(d), base_url=ctx["base_url"]) or []
+        if board:
+            break
+        day += timedelta(days=1)
+    live = pd.DataFrame(board)
+    if live.empty:
+        return 0
+    mp.REGISTRY = ModelRegistry(ctx["models_dir"])
+    mp._TEAM_STATE = load_team_state(path=os.path.join(ctx["data_dir"], "team_state.json"),
+                                     store_dir=ctx["store_dir"])
+    for _ in range(1 + ctx["predict_calls"]):
+        mp.predict_today(live.copy())
+    return len(live)
+
+
+STAGE_FUNCS = {"collect": _stage_collect, "features": _stage_features,
+               "train": _stage_train, "predict": _stage_predict}
+
+
+def _measure(stage, ctx, profile, top):
+    reset_peak_rss()
+    rss_before = status_mb("VmRSS")
+    profiler = cProfile.Profile() if profile else None
+    t0 = time.perf_counter()
+    if profiler:
+        rows = profiler.runcall(STAGE_FUNCS[stage], ctx)
+    else:
+        rows = STAGE_FUNCS[stage](ctx)
+    seconds = time.perf_counter() - t0
+    peak = status_mb("VmHWM")
+    record = {
+        "stage": stage, "seconds": round(seconds, 4), "rows": rows,
+        "peak_rss_mb": round(peak, 1), "rss_delta_mb": round(peak - rss_before, 1),
+        "child_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+    if profiler:
+        record["hot_spots"] = _hot_spots(profiler, top)
+    return record
+
+
+def run_child(cfg):
+    """Run the configured stages for one scale in this interpreter; returns the stage records."""
+    from bench.fake_espn import FakeESPNServer, league_teams
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = dict(cfg, data_dir=tmp, store_dir=os.path.join(tmp, "store"),
+                   models_dir=os.path.join(tmp, "models"))
+        # collect crawls seasons up to the current one (through Jul 1 next year); dating the fake
+        # server's "today" after that makes every crawled game final, so --seasons N is N full seasons
+        final_through = f"{datetime.today().year + 1}0702"
+        with FakeESPNServer(latency=cfg["latency"], leagues=league_teams(cfg["leagues"]),
+                            today_str=final_through) as server:
+            ctx["base_url"] = server.base_url
+            # every stage needs the output of the ones before it; unrequested ones run unmeasured
+            last = max(STAGES.index(stage) for stage in cfg["stages"])
+            for stage in STAGES[:last + 1]:
+                if stage not in cfg["stages"]:
+                    STAGE_FUNCS[stage](ctx)
+                    continue
+                record = _measure(stage, ctx, cfg["profile"], cfg["top"])
+                record.update(seasons=cfg["seasons"], leagues=cfg["leagues"], profiled=cfg["profile"])
+                records.append(record)
+    return records
+
+
+# -------------------------------
+# History / regression check
+# -------------------------------
+def machine_id():
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}cpu|py{platform.python_version()}"
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_history(history, path=HISTORY_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(history, fh, indent=1)
+    os.replace(tmp, path)
+
+
+def _key(record):
+    return record["stage"], record["seasons"], record["leagues"], record.get("profiled", False)
+
+
+def find_regressions(records, history, threshold, baseline_runs=3):
+    """
+    Compare each record's seconds and peak RSS with the median of the last
+    `baseline_runs` matching records from earlier runs on this machine.
+    Returns human-readable regression messages.
+    """
+    previous = {}
+    for run in history["runs"]:
+        if run.get("machine") != machine_id():
+            continue
+        for rec in run["results"]:
+            previous.setdefault(_key(rec), []).append(rec)
+
+    problems = []
+    for rec in records:
+        past = previous.get(_key(rec), [])[-baseline_runs:]
+        if not past:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_rss_mb", MIN_RSS_MB)):
+            base = statistics.median(p[metric] for p in past)
+            if rec[metric] > max(base * (1 + threshold), base + floor):
+                problems.append(f"{rec['stage']} @ {rec['seasons']} season(s) × {rec['leagues']} league(s): "
+                                f"{metric} {rec[metric]:.2f} vs baseline {base:.2f} "
+                                f"(+{(rec[metric] / base - 1) * 100:.0f}%)")
+    return problems
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="End-to-end pipeline benchmark")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--leagues", type=int, nargs="+", default=[1])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake ESPN round trip in seconds")
+    parser.add_argument("--workers", type=int, default=8, help="crawler threads")
+    parser.add_argument("--train-workers", type=int, default=None, help="training processes (default: CPUs)")
+    parser.add_argument("--predict-calls", type=int, default=50)
+    parser.add_argument("--no-profile", dest="profile", action="store_false")
+    parser.add_argument("--top", type=int, default=10, help="hot spots kept per stage")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown / growth")
+    parser.add_argument("--baseline-runs", type=int, default=3)
+    parser.add_argument("--no-save", dest="save", action="store_false")
+    args = parser.parse_args(argv)
+
+    records = []
+    for leagues in args.leagues:
+        for seasons in args.seasons:
+            cfg = {"seasons": seasons, "leagues": leagues, "stages": args.stages, "latency": args.latency,
+                   "workers": args.workers, "train_workers": args.train_workers, "predict_calls": args.predict_calls,
+                   "profile": args.profile, "top": args.top}
+            print(f"--- {seasons} season(s) × {leagues} league(s) ---", flush=True)
+            proc = subprocess.run([sys.executable, "-m", "bench.pipeline", "--child", json.dumps(cfg)],
+                                  cwd=REPO_DIR, capture_output=True, text=True)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith(RESULT_PREFIX)]
+            if proc.returncode != 0 or not lines:
+                print(proc.stdout[-2000:], proc.stderr[-4000:], sep="\n")
+                raise SystemExit(f"❌ Benchmark child failed for {seasons} season(s) × {leagues} league(s)")
+            for rec in json.loads(lines[-1][len(RESULT_PREFIX):]):
+                records.append(rec)
+                hot = rec.get("hot_spots", [{}])[0].get("function", "-")
+                print(f"{rec['stage']:<9} rows={rec['rows']:<7d} {rec['seconds']:8.2f}s  "
+                      f"peak RSS {rec['peak_rss_mb']:7.1f}MB (+{rec['rss_delta_mb']:.1f})  top: {hot}")
+
+    history = load_history(args.history)
+    problems = find_regressions(records, history, args.threshold, args.baseline_runs)
+    if args.save:
+        history["runs"].append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+            "machine": machine_id(), "results": records,
+        })
+        save_history(history, args.history)
+        print(f"Results appended to {args.history}")
+    if problems:
+        print(f"❌ PERFORMANCE REGRESSION (threshold {args.threshold:.0%}):")
+        for msg in problems:
+            print(f"  - {msg}")
+        return 1
+    print("✅ No regressions against the recorded history.")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(RESULT_PREFIX + json.dumps(run_child(json.loads(sys.argv[2]))))
+    else:
+        sys.exit(main())
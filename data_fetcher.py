@@ -1,7 +1,8 @@
 import os, sys, pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
-import requests
-from data_saver import collect_season_data
+from espn_cache import CACHE
+from espn_parser import HISTORY_COLUMNS, LIVE_COLUMNS, games_frame, iter_games
 
 file_dir = os.path.dirname(__file__)
 sys.path.append(file_dir)
@@ -10,49 +11,30 @@ sys.path.append(file_dir)
 # Live / Past Week ESPN Feeds
 # -------------------------------
 def get_live_scoreboard():
-    url = "https://site.web.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+    """Today's board; served from the shared cache for up to espn_cache.LIVE_TTL seconds."""
     try:
-        resp = requests.get(url, timeout=10)
-        events = resp.json().get("events", [])
-        games = []
-        for e in events:
-            comp = e["competitions"][0]
-            home = [t for t in comp["competitors"] if t["homeAway"] == "home"][0]
-            away = [t for t in comp["competitors"] if t["homeAway"] == "away"][0]
-            games.append({
-                "home_team": home["team"]["displayName"],
-                "away_team": away["team"]["displayName"],
-                "start_time": e["date"][:19].replace("T", " "),
-                "status": e["status"]["type"]["description"],
-                "home_score": home.get("score", 0),
-                "away_score": away.get("score", 0)
-            })
-        return pd.DataFrame(games)
+        return games_frame(iter_games(CACHE.get()), LIVE_COLUMNS)
     except Exception as e:
         print("ESPN fetch error:", e)
         return pd.DataFrame()
 
 def get_historical_games(days_back=7):
+    """
+    Final scores of the last `days_back` days. Settled days come from the
+    on-disk scoreboard cache; the remaining ones are fetched concurrently.
+    """
     today = date.today()
-    all_games = []
+    days = [(today - timedelta(days=i)).strftime("%Y%m%d") for i in range(1, days_back + 1)]
     try:
-        for i in range(1, days_back + 1):
-            d = (today - timedelta(days=i)).strftime("%Y%m%d")
-            url = f"https://site.web.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard?dates={d}"
-            resp = requests.get(url, timeout=10)
-            for e in resp.json().get("events", []):
-                comp = e["competitions"][0]
-                home = [t for t in comp["competitors"] if t["homeAway"] == "home"][0]
-                away = [t for t in comp["competitors"] if t["homeAway"] == "away"][0]
-                all_games.append({
-                    "date": d,
-                    "home_team": home["team"]["displayName"],
-                    "away_team": away["team"]["displayName"],
-                    "home_score": home.get("score", 0),
-                    "away_score": away.get("score", 0),
-                    "status": e["status"]["type"]["description"]
-                })
-        return pd.DataFrame(all_games)
+        with ThreadPoolExecutor(max_workers=max(1, min(8, days_back))) as pool:
+            payloads = list(pool.map(CACHE.get, days))
+        rows = (row for d, payload in zip(days, payloads) for row in iter_games(payload, date_str=d))
+        return games_frame(rows, HISTORY_COLUMNS)
     except Exception as e:
         print("Historical fetch error:", e)
         return pd.DataFrame()
+
+
+def cache_stats():
+    """Hit/miss counters of the shared scoreboard cache."""
+    return CACHE.stats()
@@ -1,76 +1,244 @@
 import os
-import requests
+import json
+import shutil
+import uuid
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+import game_store
+from espn_http import ESPN_SCOREBOARD_URL, make_session
+from espn_parser import games_frame, iter_games, loads, row_from_json, unique_games
+
+DATA_DIR = game_store.DATA_DIR
 os.makedirs(DATA_DIR, exist_ok=True)
 
-def collect_season_data(seasons_back=5, progress_cb=None):
+FLUSH_ROWS = 20000  # games buffered before a crawl writes a chunk to the store
+
+
+def season_days(season):
+    """All scoreboard dates (YYYYMMDD) from Oct 1 of `season` to Jul 1 of the next year."""
+    day = datetime(season, 10, 1)
+    end = datetime(season + 1, 7, 1)
+    days = []
+    while day <= end:
+        days.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return days
+
+
+def parse_scoreboard(payload, season_label, date_str):
+    """Turn one ESPN scoreboard payload into GameRows (duplicate listings dropped)."""
+    return list(unique_games(iter_games(payload, season_label, date_str)))
+
+
+def fetch_day(session, date_str, season_label, base_url=ESPN_SCOREBOARD_URL, timeout=15):
+    """
+    Fetch one day of games. Returns the parsed rows, or None when ESPN
+    still answers with a non-200 status after retries.
+    """
+    resp = session.get(base_url, params={"dates": date_str, "limit": 200, "groups": 50}, timeout=timeout)
+    if resp.status_code != 200:
+        print(f"⚠️ Skipped {date_str} — HTTP {resp.status_code}")
+        return None
+    return parse_scoreboard(loads(resp.content), season_label, date_str)
+
+
+def _checkpoint_path(checkpoint_dir, season_label):
+    return os.path.join(checkpoint_dir, f"{season_label}.jsonl")
+
+
+def load_checkpoint(checkpoint_dir, season_label):
+    """Read the per-day checkpoint of a season → {date_str: [GameRow]}."""
+    path = _checkpoint_path(checkpoint_dir, season_label)
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # last line can be truncated if the previous run was killed mid-write
+                continue
+            done[entry["date"]] = list(unique_games(row_from_json(g) for g in entry["games"]))
+    return done
+
+
+def fetch_days(pending, workers=8, base_url=ESPN_SCOREBOARD_URL, checkpoint_dir=None, today_str=None):
+    """
+    Fetch (season_label, date_str) days concurrently over one pooled session.
+    Yields (season_label, date_str, rows) in the calling thread as days finish;
+    rows is None for a day that failed. Past days are appended to the season
+    checkpoint when `checkpoint_dir` is given.
+    """
+    today_str = today_str or datetime.today().strftime("%Y%m%d")
+    session = make_session(pool_size=workers)
+    checkpoint_files = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fetch_day, session, d, label, base_url): (label, d)
+                for label, d in pending
+            }
+            for fut in as_completed(futures):
+                label, d = futures[fut]
+                try:
+                    rows = fut.result()
+                except Exception as e:
+                    print(f"⚠️ Failed {d} — {e}")
+                    rows = None
+                # only past days are final; today/future days are re-fetched next run
+                if rows is not None and checkpoint_dir and d < today_str:
+                    fh = checkpoint_files.get(label)
+                    if fh is None:
+                        fh = open(_checkpoint_path(checkpoint_dir, label), "a", encoding="utf-8")
+                        checkpoint_files[label] = fh
+                    fh.write(json.dumps({"date": d, "games": rows}) + "\n")
+                    fh.flush()
+                yield label, d, rows
+    finally:
+        for fh in checkpoint_files.values():
+            fh.close()
+        session.close()
+
+
+def collect_season_data(seasons_back=5, progress_cb=None, workers=8, resume=True,
+                        base_url=ESPN_SCOREBOARD_URL, data_dir=DATA_DIR):
     """
     Collect all NBA games from ESPN open API for past N seasons.
     Now handles ESPN scoreboard endpoint's daily cap using &limit=200&groups=50.
-    Shows progress with optional callback (for Streamlit progress bar).
+    Days are fetched concurrently over one pooled session (`workers` threads)
+    and every finished past day is checkpointed under data/checkpoints, so an
+    interrupted run resumes where it stopped when `resume` is set.
+    Parsed games are flushed to a staging store every FLUSH_ROWS rows (memory
+    stays flat however many seasons are crawled), which replaces the games
+    table once the crawl is complete.
+    Shows per-day progress with optional callback (for Streamlit progress bar).
     """
-    all_games = []
     today = datetime.today()
+    today_str = today.strftime("%Y%m%d")
     start_year = today.year - seasons_back
-    seasons_collected = 0
-    total_seasons = (today.year + 1) - start_year
+    checkpoint_dir = os.path.join(data_dir, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    store_dir = os.path.join(data_dir, "store")
+    staging_dir = os.path.join(data_dir, f"store.staging-{uuid.uuid4().hex[:8]}")
+
+    buffer = []
+    counts = {}
+
+    def _add(label, rows):
+        buffer.extend(rows)
+        counts[label] = counts.get(label, 0) + len(rows)
+        if len(buffer) >= FLUSH_ROWS:
+            game_store.append_games(games_frame(buffer), staging_dir)
+            buffer.clear()
 
     try:
+        # (season_label, date_str) for every day still to fetch; checkpointed days go straight to the store
+        pending = []
+        total_days = 0
         for season in range(start_year, today.year + 1):
-            print(f"Fetching season {season}-{season+1} ...")
-            start = datetime(season, 10, 1)
-            end = datetime(season + 1, 7, 1)
-            date = start
-            games_this_season = 0
-
-            while date <= end:
-                date_str = date.strftime("%Y%m%d")
-                url = (
-                    f"https://site.web.api.espn.com/apis/site/v2/sports/basketball/nba/"
-                    f"scoreboard?dates={date_str}&limit=200&groups=50"
-                )
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 200:
-                    games_today = 0
-                    for evt in resp.json().get("events", []):
-                        try:
-                            comp = evt["competitions"][0]
-                            home = [t for t in comp["competitors"] if t["homeAway"] == "home"][0]
-                            away = [t for t in comp["competitors"] if t["homeAway"] == "away"][0]
-                            all_games.append({
-                                "season": f"{season}-{season+1}",
-                                "date": date_str,
-                                "home_team": home["team"]["displayName"],
-                                "away_team": away["team"]["displayName"],
-                                "home_score": home.get("score", 0),
-                                "away_score": away.get("score", 0),
-                                "status": evt["status"]["type"]["description"]
-                            })
-                            games_today += 1
-                        except Exception:
-                            continue
-                    games_this_season += games_today
+            label = f"{season}-{season+1}"
+            counts[label] = 0
+            days = season_days(season)
+            total_days += len(days)
+            done = load_checkpoint(checkpoint_dir, label) if resume else {}
+            if not resume and os.path.exists(_checkpoint_path(checkpoint_dir, label)):
+                os.remove(_checkpoint_path(checkpoint_dir, label))
+            for d in days:
+                if d in done:
+                    _add(label, done[d])
                 else:
-                    print(f"⚠️ Skipped {date_str} — HTTP {resp.status_code}")
+                    pending.append((label, d))
+            del done
 
-                date += timedelta(days=1)
+        finished = total_days - len(pending)
+        failed = []
+        if finished:
+            print(f"Resuming — {finished}/{total_days} days already checkpointed.")
+        if progress_cb:
+            progress_cb(finished / total_days)
 
-            print(f"Season {season}-{season+1} collected {games_this_season} games.")
-            seasons_collected += 1
+        for label, d, rows in fetch_days(pending, workers=workers, base_url=base_url,
+                                         checkpoint_dir=checkpoint_dir, today_str=today_str):
+            if rows is None:
+                failed.append(d)
+            else:
+                _add(label, rows)
+            finished += 1
             if progress_cb:
-                progress_cb(seasons_collected / total_seasons)
-
-        df = pd.DataFrame(all_games)
-        # ESPN can sometimes duplicate game ids for playback; ensure no duplicates
-        df.drop_duplicates(subset=["date", "home_team", "away_team"], inplace=True)
-        saved_file = os.path.join(DATA_DIR, "nba_games_5yr.csv")
-        df.to_csv(saved_file, index=False)
-        print(f"✅ Saved ALL {len(df)} games → {saved_file}")
+                progress_cb(finished / total_days)
+
+        for label, n in counts.items():
+            print(f"Season {label} collected {n} games.")
+        if buffer:
+            game_store.append_games(games_frame(buffer), staging_dir)
+            buffer.clear()
+        game_store.replace_games(staging_dir, store_dir)
+        df = game_store.read_games(store_dir=store_dir)
+        print(f"✅ Saved ALL {len(df)} games → {store_dir}")
+
+        if failed:
+            print(f"⚠️ {len(failed)} days failed — run again to resume from the checkpoint.")
+        else:
+            for label in counts:
+                path = _checkpoint_path(checkpoint_dir, label)
+                if os.path.exists(path):
+                    os.remove(path)
+        return df
+
+    except Exception as e:
+        print(f"Data collection failed: {e} (progress kept in {checkpoint_dir})")
+        return pd.DataFrame()
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def update_season_data(lookback_days=3, progress_cb=None, workers=8, seasons_back=5,
+                       base_url=ESPN_SCOREBOARD_URL, data_dir=DATA_DIR):
+    """
+    Incremental refresh of the game store.
+    Fetches only the days after the last date with final results, plus a
+    `lookback_days` window to pick up postponed or in-progress games, and
+    upserts them into the store (dedup on date/home_team/away_team).
+    Falls back to a full collect_season_data crawl when no dataset exists yet.
+    """
+    store_dir = os.path.join(data_dir, "store")
+    last_final = game_store.last_final_date(store_dir)
+    if last_final is None:
+        print("No existing final results — running full collection.")
+        return collect_season_data(seasons_back, progress_cb=progress_cb, workers=workers,
+                                   base_url=base_url, data_dir=data_dir)
+
+    today = datetime.today()
+    day = last_final - timedelta(days=lookback_days)
+    pending = []
+    while day <= today:
+        d = day.strftime("%Y%m%d")
+        pending.append((game_store.season_label(d), d))
+        day += timedelta(days=1)
+    print(f"Incremental update — last final results {last_final:%Y-%m-%d}, fetching {len(pending)} days.")
+
+    try:
+        new_games = []
+        refreshed = []
+        for i, (label, d, rows) in enumerate(fetch_days(pending, workers=workers, base_url=base_url), 1):
+            if rows is not None:
+                refreshed.append(d)
+                new_games.extend(rows)
+            if progress_cb:
+                progress_cb(i / len(pending))
+
+        # refetched days replace what was stored for them (e.g. a game that went final)
+        game_store.upsert_games(games_frame(new_games, game_store.GAME_COLUMNS),
+                                replace_dates=refreshed, store_dir=store_dir)
+        df = game_store.read_games(store_dir=store_dir)
+        print(f"✅ Merged {len(new_games)} fetched games → {len(df)} total → {store_dir}")
+        if len(refreshed) < len(pending):
+            print(f"⚠️ {len(pending) - len(refreshed)} days failed — rerun with a larger lookback_days to retry them.")
         return df
 
     except Exception as e:
-        print(f"Data collection failed: {e}")
+        print(f"Incremental update failed: {e}")
         return pd.DataFrame()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date
+
+import game_store
+from espn_http import make_session, ESPN_SCOREBOARD_URL
+from espn_parser import loads
+
+CACHE_DIR = os.path.join(game_store.DATA_DIR, "cache", "scoreboard")
+LIVE_TTL = 30           # seconds; today's board and the undated live board
+UNSETTLED_TTL = 600     # seconds; past dates with games not final yet (late feeds, postponements)
+SETTLED_STATUSES = ("Final", "Postponed", "Canceled", "Cancelled")
+
+
+def is_settled(payload):
+    """True when no game on the scoreboard can still change."""
+    for evt in payload.get("events", []):
+        status = evt.get("status", {}).get("type", {})
+        if not (status.get("completed") or str(status.get("description", "")).startswith(SETTLED_STATUSES)):
+            return False
+    return True
+
+
+class _Flight:
+    __slots__ = ("done", "payload", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.payload = None
+        self.error = None
+
+
+class ScoreboardCache:
+    """
+    Process-wide cache in front of the ESPN scoreboard endpoint.
+    Past dates whose games are all settled are kept forever (in memory and as
+    JSON files under data/cache/scoreboard/<endpoint hash>, so boards from a
+    mirror or stand-in never pass for ESPN's); today's board expires after
+    `live_ttl` seconds. Concurrent requests for the same board share one
+    in-flight HTTP call (single flight), so every Streamlit session together
+    hits ESPN at most once per TTL window.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, live_ttl=LIVE_TTL, unsettled_ttl=UNSETTLED_TTL,
+                 base_url=ESPN_SCOREBOARD_URL, timeout=10):
+        # one subdirectory per endpoint: a board is only ever served back for the URL it came from
+        self.cache_dir = (os.path.join(cache_dir, hashlib.sha1(base_url.encode()).hexdigest()[:12])
+                          if cache_dir else None)
+        self.live_ttl = live_ttl
+        self.unsettled_ttl = unsettled_ttl
+        self.base_url = base_url
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+        self._memory = {}      # key -> (expires_at or None, payload)
+        self._inflight = {}    # key -> _Flight
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "shared": 0, "misses": 0, "errors": 0}
+
+    def _disk_path(self, date_str):
+        return os.path.join(self.cache_dir, f"{date_str}.json")
+
+    def _fetch(self, date_str):
+        with self._lock:
+            if self._session is None:
+                self._session = make_session()
+            session = self._session
+        params = {"dates": date_str, "limit": 200, "groups": 50} if date_str else None
+        resp = session.get(self.base_url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return loads(resp.content)
+
+    def _load(self, date_str):
+        """(payload, expires_at) from disk or ESPN; settled past dates are written to disk."""
+        past = date_str is not None and date_str < date.today().strftime("%Y%m%d")
+        if past and self.cache_dir and os.path.exists(self._disk_path(date_str)):
+            with open(self._disk_path(date_str), "rb") as fh:
+                payload = loads(fh.read())
+            with self._lock:
+                self.counters["disk_hits"] += 1
+            return payload, None
+
+        payload = self._fetch(date_str)
+        with self._lock:
+            self.counters["misses"] += 1
+        if past and is_settled(payload):
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = os.path.join(self.cache_dir, f".{date_str}.{uuid.uuid4().hex}.tmp")
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    json.dump(payload, fh)
+                os.replace(tmp, self._disk_path(date_str))
+            return payload, None
+        ttl = self.unsettled_ttl if past else self.live_ttl
+        return payload, time.monotonic() + ttl
+
+    def get(self, date_str=None):
+        """Scoreboard JSON for a YYYYMMDD date (None: ESPN's current live board)."""
+        key = date_str or "live"
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self.counters["memory_hits"] += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.counters["shared"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.payload
+
+        try:
+            payload, expires_at = self._load(date_str)
+            flight.payload = payload
+            with self._lock:
+                self._memory[key] = (expires_at, payload)
+            return payload
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        """Hit/miss counters plus the number of boards held in memory."""
+        with self._lock:
+            out = dict(self.counters)
+            out["cached_boards"] = len(self._memory)
+        lookups = out["memory_hits"] + out["disk_hits"] + out["shared"] + out["misses"]
+        out["hit_rate"] = (lookups - out["misses"]) / lookups if lookups else None
+        return out
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._memory.clear()
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+CACHE = ScoreboardCache()
@@ -0,0 +1,28 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# overridable to point the app at a mirror or a local stand-in (bench/fake_espn.py)
+ESPN_SCOREBOARD_URL = os.environ.get(
+    "ESPN_SCOREBOARD_URL", "https://site.web.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard")
+
+
+def make_session(pool_size=16, retries=3, backoff=0.5):
+    """
+    Pooled HTTP session with retry/backoff on connection errors,
+    timeouts and 429/5xx responses.
+    """
+    retry = Retry(
+        total=retries, connect=retries, read=retries, status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
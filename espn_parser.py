@@ -0,0 +1,77 @@
+import json
+from collections import namedtuple
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional, several times faster on large scoreboards
+    orjson = None
+
+# one game per row; season/date are None for the undated live board
+GameRow = namedtuple(
+    "GameRow",
+    ["season", "date", "home_team", "away_team", "home_score", "away_score", "status", "start_time"],
+    defaults=(None,),
+)
+LIVE_COLUMNS = ["home_team", "away_team", "start_time", "status", "home_score", "away_score"]
+HISTORY_COLUMNS = ["date", "home_team", "away_team", "home_score", "away_score", "status"]
+
+
+def loads(raw):
+    """Decode a scoreboard response body (bytes or str), with orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_games(payload, season_label=None, date_str=None):
+    """
+    Yield a GameRow per event of an ESPN scoreboard payload, scanning the
+    competitors once per event. Malformed events are skipped.
+    """
+    for evt in payload.get("events", ()):
+        try:
+            home = away = None
+            for team in evt["competitions"][0]["competitors"]:
+                if team["homeAway"] == "home":
+                    home = team
+                elif team["homeAway"] == "away":
+                    away = team
+            yield GameRow(
+                season_label, date_str,
+                home["team"]["displayName"], away["team"]["displayName"],
+                _score(home.get("score", 0)), _score(away.get("score", 0)),
+                evt["status"]["type"]["description"],
+                evt["date"][:19].replace("T", " "),
+            )
+        except (KeyError, IndexError, TypeError):
+            continue
+
+
+def unique_games(rows):
+    """Drop repeated (date, home_team, away_team) rows, keeping the first (ESPN can list a game twice)."""
+    seen = set()
+    for row in rows:
+        key = (row.date, row.home_team, row.away_team)
+        if key not in seen:
+            seen.add(key)
+            yield row
+
+
+def row_from_json(obj):
+    """GameRow from a checkpoint entry: a list in field order, or a dict from older checkpoints."""
+    return GameRow(**obj) if isinstance(obj, dict) else GameRow(*obj)
+
+
+def games_frame(rows, columns=None):
+    """DataFrame of GameRows, optionally restricted to `columns`."""
+    df = pd.DataFrame.from_records(list(rows), columns=GameRow._fields)
+    return df[columns] if columns is not None else df
@@ -0,0 +1,145 @@
+import time
+
+import numpy as np
+
+# above this many rows the per-tree compiled walk beats the vectorized one
+LARGE_BATCH = 256
+
+
+def flatten_forest(forest):
+    """
+    Pack every tree of a fitted RandomForestClassifier into flat node arrays.
+    Leaves point to themselves with an +inf threshold, so a fixed number of
+    steps (the deepest tree's depth) walks every sample to its leaf.
+    """
+    feature, threshold, left, right, leaf_prob, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        idx = np.arange(n)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(np.where(is_leaf, idx, tree.children_left) + offset)
+        right.append(np.where(is_leaf, idx, tree.children_right) + offset)
+        value = tree.value[:, 0, :]
+        leaf_prob.append(value[:, 1] / value.sum(axis=1))
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+    left = np.concatenate(left).astype(np.intp)
+    right = np.concatenate(right).astype(np.intp)
+    return {
+        "feature": np.concatenate(feature).astype(np.intp),
+        "threshold": np.concatenate(threshold),
+        # child[2 * node] is the left child, child[2 * node + 1] the right one
+        "child": np.stack([left, right], axis=1).ravel(),
+        "leaf_prob": np.concatenate(leaf_prob),
+        "roots": np.asarray(roots, dtype=np.intp),
+        "max_depth": max_depth,
+        "trees": [est.tree_ for est in forest.estimators_],
+    }
+
+
+def forest_proba(flat, X):
+    """P(class 1) of the flattened forest for float32-cast rows X (n_samples, n_features)."""
+    n, n_features = X.shape
+    if n > LARGE_BATCH:
+        total = np.zeros(n)
+        for root, tree in zip(flat["roots"], flat["trees"]):
+            total += flat["leaf_prob"][root + tree.apply(X)]
+        return total / len(flat["trees"])
+    values = X.astype(np.float64).ravel()
+    row_offset = (np.arange(n) * n_features)[:, None]
+    node = np.broadcast_to(flat["roots"], (n, flat["roots"].size)).copy()
+    feature, threshold, child = flat["feature"], flat["threshold"], flat["child"]
+    for _ in range(flat["max_depth"]):
+        # sklearn goes left on x <= threshold; leaves have +inf and stay put
+        go_right = values[feature[node] + row_offset] > threshold[node]
+        node = child[2 * node + go_right]
+    return flat["leaf_prob"][node].mean(axis=1)
+
+
+def _linear(model):
+    """(coef, intercept) of a fitted single-output sklearn linear model."""
+    return np.asarray(model.coef_, dtype=np.float64).ravel(), float(np.ravel(model.intercept_)[0])
+
+
+def _regression_head(models, spec):
+    """Plain-array form of a point-market stack: XGB boosters, linear coefficients, linear meta."""
+    base = []
+    for name in spec["base"]:
+        model = models[name]
+        if hasattr(model, "get_booster"):
+            base.append(("xgb", model.get_booster()))
+        elif hasattr(model, "coef_"):
+            base.append(("linear", _linear(model)))
+        else:
+            base.append(("model", model))
+    return base, _linear(models[spec["meta"]])
+
+
+class FusedScorer:
+    """
+    Stacked-ensemble scorer built from plain arrays: scaler and logistic
+    coefficients as NumPy vectors, XGBoost boosters via inplace_predict and
+    the random forest as flattened node arrays (walked per tree for batches
+    over LARGE_BATCH rows). Matches the
+    scaler -> predict_proba x3 -> meta path within float tolerance.
+    `markets` ({market: {"base": [...], "meta": name}}) adds the point-market
+    regression stacks, scored by predict_markets from the same scaled rows.
+    """
+
+    def __init__(self, models, scaler, markets=None):
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        lr = models["lr"]
+        self.lr_coef = lr.coef_.ravel().astype(np.float64)
+        self.lr_intercept = float(lr.intercept_[0])
+        self.xgb = models["xgb"].get_booster()
+        self.meta = models["meta_stacker"].get_booster()
+        self.forest = flatten_forest(models["rf"])
+        self.heads = {market: _regression_head(models, spec) for market, spec in (markets or {}).items()}
+        self.last_timings = {}
+
+    def _scale(self, X):
+        X = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        # sklearn trees and xgboost both split on float32 inputs
+        return X, X.astype(np.float32)
+
+    def _moneyline(self, X, X32):
+        meta_inputs = np.empty((X.shape[0], 3), dtype=np.float32)
+        meta_inputs[:, 0] = self.xgb.inplace_predict(X32)
+        meta_inputs[:, 1] = forest_proba(self.forest, X32)
+        meta_inputs[:, 2] = 1.0 / (1.0 + np.exp(-(X @ self.lr_coef + self.lr_intercept)))
+        return self.meta.inplace_predict(meta_inputs)
+
+    def predict_proba(self, X):
+        """P(win) for raw (unscaled) feature rows."""
+        return self._moneyline(*self._scale(X))
+
+    def predict_markets(self, X):
+        """
+        {"moneyline": P(win), <market>: prediction, ...} for raw feature rows,
+        scaling once for every market. Per-market seconds go to last_timings.
+        """
+        X, X32 = self._scale(X)
+        t0 = time.perf_counter()
+        out = {"moneyline": self._moneyline(X, X32)}
+        timings = {"moneyline": time.perf_counter() - t0}
+        for market, (base, (meta_coef, meta_intercept)) in self.heads.items():
+            t0 = time.perf_counter()
+            meta_inputs = np.empty((X.shape[0], len(base)))
+            for i, (kind, model) in enumerate(base):
+                if kind == "xgb":
+                    meta_inputs[:, i] = model.inplace_predict(X32)
+                elif kind == "linear":
+                    meta_inputs[:, i] = X @ model[0] + model[1]
+                else:
+                    meta_inputs[:, i] = model.predict(X)
+            out[market] = meta_inputs @ meta_coef + meta_intercept
+            timings[market] = time.perf_counter() - t0
+        self.last_timings = timings
+        return out
@@ -2,58 +2,161 @@ import pandas as pd
 import numpy as np
 import os
 
-def build_features(input_csv="data/nba_games_5yr.csv", output_csv="data/features_ready.csv"):
+import game_store
+from ratings import RATING_FEATURES, pregame_ratings, team_rating_features
+
+WINDOWS = (5, 10)
+
+
+def feature_columns(windows=WINDOWS):
+    """Model input columns, in training order, for the given rolling windows."""
+    cols = ["is_home"]
+    for n in windows:
+        cols += [f"avg_pts_{n}", f"avg_pa_{n}", f"win_rate_{n}"]
+    return cols
+
+
+def model_features(windows=WINDOWS):
+    """Rolling columns followed by the pre-game rating columns."""
+    return feature_columns(windows) + RATING_FEATURES
+
+
+MODEL_FEATURES = model_features()
+
+
+def team_game_table(games):
+    """
+    Reshape games (one row per game) into a long team-game table with two
+    rows per game, sorted by team then date (stable, so same-day games keep
+    their original order).
+    """
+    n_games = len(games)
+    # team codes in order of first appearance, matching the old per-team loop
+    codes, teams = pd.factorize(games[["home_team", "away_team"]].astype(str).values.ravel())
+    codes = codes.reshape(n_games, 2)
+    home_score = games["home_score"].to_numpy()
+    away_score = games["away_score"].to_numpy()
+    dates = games["date"].to_numpy()
+
+    team = np.concatenate([codes[:, 0], codes[:, 1]])
+    opponent = np.concatenate([codes[:, 1], codes[:, 0]])
+    is_home = np.r_[np.ones(n_games, dtype=int), np.zeros(n_games, dtype=int)]
+    points_for = np.concatenate([home_score, away_score])
+    points_against = np.concatenate([away_score, home_score])
+    game_idx = np.r_[np.arange(n_games), np.arange(n_games)]
+    date = np.concatenate([dates, dates])
+
+    # a team listed on both sides (ESPN "TBD" placeholders) only gets its home row
+    keep = np.r_[np.ones(n_games, dtype=bool), codes[:, 0] != codes[:, 1]]
+    order = np.flatnonzero(keep)
+    order = order[np.lexsort((game_idx[order], date[order], team[order]))]
+
+    long = pd.DataFrame({
+        "date": date[order],
+        "team_name": np.asarray(teams, dtype=object)[team[order]],
+        "opponent": np.asarray(teams, dtype=object)[opponent[order]],
+        "is_home": is_home[order],
+        "points_for": points_for[order],
+        "points_against": points_against[order],
+        "game_idx": game_idx[order],
+        "team_code": team[order],
+    })
+    long["win_flag"] = (long["points_for"] > long["points_against"]).astype(int)
+    return long
+
+
+def add_rolling_features(long, windows=WINDOWS):
+    """
+    Add avg_pts_n / avg_pa_n / win_rate_n: the mean over each team's previous
+    (up to) n games, excluding the current one; NaN for a team's first game.
+    One cumulative-sum pass per stat over the team-sorted table.
+    """
+    team_codes = long["team_code"].to_numpy()
+    pos = np.arange(len(long))
+    # index of the first row of each row's team block
+    starts = np.flatnonzero(np.r_[True, team_codes[1:] != team_codes[:-1]])
+    group_start = starts[np.searchsorted(starts, pos, side="right") - 1]
+
+    stats = {"avg_pts": "points_for", "avg_pa": "points_against", "win_rate": "win_flag"}
+    csums = {}
+    for prefix, col in stats.items():
+        # integer cumulative sums keep window sums exact
+        csums[prefix] = np.r_[0, np.cumsum(long[col].to_numpy(dtype=np.int64))]
+
+    for n in windows:
+        lo = np.maximum(pos - n, group_start)
+        count = (pos - lo).astype(float)
+        count[count == 0] = np.nan
+        for prefix, cs in csums.items():
+            long[f"{prefix}_{n}"] = (cs[pos] - cs[lo]) / count
+    return long
+
+
+def usable_games(games):
+    """
+    Games that feed the rolling stats: scored and, when a status is known,
+    final (scheduled/postponed games carry 0-0 placeholder scores).
+    Shared with team_state so batch and live features see the same games.
+    """
+    games = games.dropna(subset=["home_score", "away_score"])
+    if "status" in games:
+        games = games[games["status"].astype(str).str.startswith("Final")]
+    return games.reset_index(drop=True)
+
+
+def add_rating_features(long, games):
+    """
+    Add RATING_FEATURES to the team-game table: each side's Elo/Massey before
+    the game from one chronological pass over `games` (ratings.pregame_ratings).
+    """
+    ratings, _ = pregame_ratings(games)
+    g = long["game_idx"].to_numpy()
+    home = long["is_home"].to_numpy() == 1
+    r = {c: ratings[c].to_numpy()[g] for c in ratings.columns}
+    feats = team_rating_features(
+        long["is_home"].to_numpy(),
+        np.where(home, r["home_elo"], r["away_elo"]), np.where(home, r["away_elo"], r["home_elo"]),
+        np.where(home, r["home_massey"], r["away_massey"]), np.where(home, r["away_massey"], r["home_massey"]),
+    )
+    for col in RATING_FEATURES:
+        long[col] = feats[col].to_numpy()
+    return long
+
+
+def compute_features(games, windows=WINDOWS):
+    """Vectorized feature frame (no I/O) from a games frame."""
+    games = usable_games(games)
+    long = add_rolling_features(team_game_table(games), windows)
+    long = add_rating_features(long, games)
+    long = long.dropna(subset=[f"avg_pts_{n}" for n in windows])
+    combined = long.sort_values("date", kind="stable").reset_index(drop=True)
+
+    feature_cols = ["date", "team_name"] + model_features(windows) + ["points_for", "points_against", "win_flag"]
+    return combined[feature_cols].copy()
+
+
+def build_features(input_csv=None, output_csv=None, store_dir=game_store.STORE_DIR, windows=WINDOWS):
     """
     Create model-ready features from multi-season game data.
-    Generates rolling stats, opponent differentials, and context flags.
-    Output: features_ready.csv
-    """
-    if not os.path.exists(input_csv):
-        raise FileNotFoundError(f"{input_csv} not found.")
-
-    df = pd.read_csv(input_csv)
-    df = df.dropna(subset=["home_score", "away_score"]).reset_index(drop=True)
-
-    # compute win labels (1 = home win)
-    df["home_win"] = (df["home_score"] > df["away_score"]).astype(int)
-
-    # numerical stats per team
-    team_stats = []
-
-    for team in pd.unique(df[["home_team", "away_team"]].values.ravel()):
-        team_games = df[(df["home_team"] == team) | (df["away_team"] == team)].copy()
-
-        team_games = team_games.sort_values("date")
-        team_games["points_for"] = np.where(team_games["home_team"] == team,
-                                            team_games["home_score"], team_games["away_score"])
-        team_games["points_against"] = np.where(team_games["home_team"] == team,
-                                                team_games["away_score"], team_games["home_score"])
-        team_games["win_flag"] = (team_games["points_for"] > team_games["points_against"]).astype(int)
-
-        # rolling averages 5 and 10-game windows
-        for n in [5, 10]:
-            team_games[f"avg_pts_{n}"] = team_games["points_for"].rolling(n, min_periods=1).mean().shift(1)
-            team_games[f"avg_pa_{n}"] = team_games["points_against"].rolling(n, min_periods=1).mean().shift(1)
-            team_games[f"win_rate_{n}"] = team_games["win_flag"].rolling(n, min_periods=1).mean().shift(1)
-
-        # determine if home or away for this team each game
-        team_games["is_home"] = (team_games["home_team"] == team).astype(int)
-        team_games["team_name"] = team
-        team_stats.append(team_games)
-
-    combined = pd.concat(team_stats).sort_values("date").reset_index(drop=True)
-    combined = combined.dropna().reset_index(drop=True)
-
-    # keep only relevant columns
-    feature_cols = [
-        "date", "team_name", "is_home", "avg_pts_5", "avg_pa_5", "win_rate_5",
-        "avg_pts_10", "avg_pa_10", "win_rate_10", "points_for", "points_against", "win_flag"
-    ]
-    feats = combined[feature_cols].copy()
-    feats = feats.dropna()
-
-    feats.to_csv(output_csv, index=False)
-    print(f"✅ Features ready: {output_csv} - {len(feats)} rows.")
+    Generates rolling stats, pre-game Elo/Massey ratings, and context flags.
+    Reads games from the game store (or `input_csv` if given) and writes
+    the features back to the store; `output_csv` additionally exports a CSV.
+    """
+    if input_csv is not None:
+        if not os.path.exists(input_csv):
+            raise FileNotFoundError(f"{input_csv} not found.")
+        df = pd.read_csv(input_csv)
+    else:
+        df = game_store.read_games(store_dir=store_dir)
+        if df is None:
+            raise FileNotFoundError("No games in the game store — collect the dataset first.")
+
+    feats = compute_features(df, windows)
+
+    game_store.write_features(feats, store_dir)
+    if output_csv is not None:
+        feats.to_csv(output_csv, index=False)
+    print(f"✅ Features ready: {output_csv or store_dir} - {len(feats)} rows.")
     return feats
 
 if __name__ == "__main__":
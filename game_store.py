@@ -0,0 +1,241 @@
+import io
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# overridable so benchmarks and scratch runs never touch the real data/ (store, caches, team state)
+DATA_DIR = os.environ.get("NBA_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+STORE_DIR = os.path.join(DATA_DIR, "store")
+LEGACY_GAMES_CSV = os.path.join(DATA_DIR, "nba_games_5yr.csv")
+
+GAMES = "games"
+FEATURES = "features"
+
+SEASON_START_MONTH = 10  # October: games from here on count toward the next season label
+
+GAME_COLUMNS = ["season", "date", "home_team", "away_team", "home_score", "away_score", "status"]
+
+# typed columns: team names / status as dictionary (pandas categorical), dates as real dates
+GAMES_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("home_team", pa.dictionary(pa.int16(), pa.string())),
+    ("away_team", pa.dictionary(pa.int16(), pa.string())),
+    ("home_score", pa.int16()),
+    ("away_score", pa.int16()),
+    ("status", pa.dictionary(pa.int8(), pa.string())),
+])
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def season_start(date_str):
+    """Start year of the season a YYYYMMDD date belongs to; seasons start in October."""
+    year, month = int(date_str[:4]), int(date_str[4:6])
+    return year if month >= SEASON_START_MONTH else year - 1
+
+
+def season_label(date_str):
+    """ESPN season label ("2024-2025") of a YYYYMMDD date."""
+    start = season_start(date_str)
+    return f"{start}-{start + 1}"
+
+
+def season_of(dates):
+    """season_label for every date of a series (vectorized)."""
+    dates = pd.to_datetime(pd.Series(dates))
+    start = dates.dt.year - (dates.dt.month < SEASON_START_MONTH).astype(int)
+    return start.astype(str) + "-" + (start + 1).astype(str)
+
+
+def _table_dir(table, store_dir):
+    return os.path.join(store_dir, table)
+
+
+def _to_dates(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.normalize()
+    return pd.to_datetime(values.astype(str), format="%Y%m%d")
+
+
+def normalize_games(df):
+    """Coerce raw game rows (ESPN strings or legacy CSV ints) to the store's typed columns."""
+    out = pd.DataFrame({
+        "season": df["season"].astype(str) if "season" in df else season_of(df["date"]),
+        "date": _to_dates(df["date"]).values,
+        "home_team": df["home_team"].astype(str).values,
+        "away_team": df["away_team"].astype(str).values,
+        "home_score": pd.to_numeric(df["home_score"], errors="coerce").fillna(0).astype("int16").values,
+        "away_score": pd.to_numeric(df["away_score"], errors="coerce").fillna(0).astype("int16").values,
+        "status": df["status"].astype(str).values,
+    })
+    return out
+
+
+def _write_partitions(frame, table_dir, schema=None, overwrite_seasons=()):
+    """Write one new parquet part per season partition; wipe `overwrite_seasons` first."""
+    for season in overwrite_seasons:
+        part_dir = os.path.join(table_dir, f"season={season}")
+        if os.path.isdir(part_dir):
+            shutil.rmtree(part_dir)
+    for season, part in frame.groupby("season", sort=True, observed=True):
+        part_dir = os.path.join(table_dir, f"season={season}")
+        os.makedirs(part_dir, exist_ok=True)
+        part = part.drop(columns="season").sort_values("date", kind="stable")
+        arrow = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+        if schema is None and "date" in part:
+            arrow = arrow.set_column(arrow.schema.get_field_index("date"), "date",
+                                     arrow["date"].cast(pa.date32()))
+        pq.write_table(arrow, os.path.join(part_dir, f"part-{uuid.uuid4().hex}.parquet"))
+
+
+def _filter(seasons=None, start_date=None, end_date=None):
+    expr = None
+    def _and(a, b):
+        return b if a is None else a & b
+    if seasons is not None:
+        expr = _and(expr, ds.field("season").isin([str(s) for s in seasons]))
+    if start_date is not None:
+        expr = _and(expr, ds.field("date") >= pa.scalar(pd.Timestamp(start_date).date(), pa.date32()))
+    if end_date is not None:
+        expr = _and(expr, ds.field("date") <= pa.scalar(pd.Timestamp(end_date).date(), pa.date32()))
+    return expr
+
+
+def _read(table_dir, columns=None, **filters):
+    if not os.path.isdir(table_dir) or not os.listdir(table_dir):
+        return None
+    dataset = ds.dataset(table_dir, format="parquet", partitioning=PARTITIONING)
+    arrow = dataset.to_table(columns=columns, filter=_filter(**filters))
+    return arrow.to_pandas(date_as_object=False)
+
+
+def has_games(store_dir=STORE_DIR):
+    table_dir = _table_dir(GAMES, store_dir)
+    return os.path.isdir(table_dir) and bool(os.listdir(table_dir))
+
+
+def write_games(df, store_dir=STORE_DIR):
+    """Replace the whole games table with `df`."""
+    table_dir = _table_dir(GAMES, store_dir)
+    if os.path.isdir(table_dir):
+        shutil.rmtree(table_dir)
+    os.makedirs(table_dir, exist_ok=True)
+    _write_partitions(normalize_games(df), table_dir, GAMES_SCHEMA)
+
+
+def append_games(df, store_dir=STORE_DIR):
+    """Append rows as new parquet parts without touching existing files."""
+    if df is None or len(df) == 0:
+        return
+    _write_partitions(normalize_games(df), _table_dir(GAMES, store_dir), GAMES_SCHEMA)
+
+
+def upsert_games(df, replace_dates=(), store_dir=STORE_DIR):
+    """
+    Merge rows into the store, rewriting only the season partitions they touch.
+    Stored rows on `replace_dates` are dropped first; remaining duplicates on
+    (date, home_team, away_team) keep the incoming row.
+    """
+    new = normalize_games(df) if len(df) else normalize_games(pd.DataFrame(columns=GAME_COLUMNS))
+    replace = set(_to_dates(list(replace_dates))) if len(replace_dates) else set()
+    seasons = sorted(set(new["season"]) | set(season_of(list(replace)) if replace else []))
+    if not seasons:
+        return
+    old = read_games(seasons=seasons, store_dir=store_dir)
+    if old is not None and len(old):
+        old = old[~old["date"].isin(replace)]
+        merged = pd.concat([normalize_games(old), new], ignore_index=True)
+    else:
+        merged = new
+    merged = merged.drop_duplicates(subset=["date", "home_team", "away_team"], keep="last")
+    table_dir = _table_dir(GAMES, store_dir)
+    os.makedirs(table_dir, exist_ok=True)
+    _write_partitions(merged, table_dir, GAMES_SCHEMA, overwrite_seasons=seasons)
+
+
+def replace_games(staging_store_dir, store_dir=STORE_DIR):
+    """
+    Swap in the games table written under another store directory (e.g. by
+    chunked append_games calls during a crawl), then drop the staging directory.
+    """
+    staged = _table_dir(GAMES, staging_store_dir)
+    if not os.path.isdir(staged):
+        raise ValueError(f"No games staged in {staging_store_dir}")
+    table_dir = _table_dir(GAMES, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    old = f"{table_dir}.old-{uuid.uuid4().hex[:8]}"
+    if os.path.isdir(table_dir):
+        os.rename(table_dir, old)
+    os.rename(staged, table_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    shutil.rmtree(staging_store_dir, ignore_errors=True)
+
+
+def read_games(seasons=None, start_date=None, end_date=None, columns=None, store_dir=STORE_DIR):
+    """
+    Load games with season / date-range predicates pushed down to parquet.
+    Seeds the store from the legacy data/nba_games_5yr.csv the first time.
+    Returns None when there is no data at all.
+    """
+    if not has_games(store_dir) and store_dir == STORE_DIR and os.path.exists(LEGACY_GAMES_CSV):
+        print(f"Importing {LEGACY_GAMES_CSV} into the game store...")
+        write_games(pd.read_csv(LEGACY_GAMES_CSV, dtype={"date": str}), store_dir)
+    df = _read(_table_dir(GAMES, store_dir), columns=columns,
+               seasons=seasons, start_date=start_date, end_date=end_date)
+    if df is None:
+        return None
+    if "season" in df:
+        df["season"] = df["season"].astype("category")
+    cols = [c for c in GAME_COLUMNS if c in df.columns and (columns is None or c in columns)]
+    return df.sort_values("date", kind="stable")[cols].reset_index(drop=True)
+
+
+def write_features(feats, store_dir=STORE_DIR):
+    """Replace the feature table (partitioned by the season of each row's date)."""
+    table_dir = _table_dir(FEATURES, store_dir)
+    if os.path.isdir(table_dir):
+        shutil.rmtree(table_dir)
+    os.makedirs(table_dir, exist_ok=True)
+    frame = feats.copy()
+    frame["date"] = _to_dates(frame["date"]).values
+    frame["team_name"] = frame["team_name"].astype("category")
+    frame["season"] = season_of(frame["date"]).values
+    _write_partitions(frame, table_dir)
+
+
+def read_features(seasons=None, start_date=None, end_date=None, columns=None, store_dir=STORE_DIR):
+    """Load the feature table (None when features have not been built yet)."""
+    df = _read(_table_dir(FEATURES, store_dir), columns=columns,
+               seasons=seasons, start_date=start_date, end_date=end_date)
+    if df is None:
+        return None
+    if "season" in df and (columns is None or "season" not in columns):
+        df = df.drop(columns="season")
+    if "date" in df:
+        df = df.sort_values("date", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def to_csv_bytes(df):
+    """CSV export (dates as YYYYMMDD like the original files) for download buttons."""
+    out = df.copy()
+    if "date" in out and pd.api.types.is_datetime64_any_dtype(out["date"]):
+        out["date"] = out["date"].dt.strftime("%Y%m%d")
+    buf = io.StringIO()
+    out.to_csv(buf, index=False)
+    return buf.getvalue().encode("utf-8")
+
+
+def last_final_date(store_dir=STORE_DIR):
+    """Latest date holding a final result, or None."""
+    games = read_games(columns=["date", "status"], store_dir=store_dir)
+    if games is None:
+        return None
+    final = games[games["status"].astype(str).str.startswith("Final")]
+    return None if final.empty else datetime.combine(final["date"].max().date(), datetime.min.time())
@@ -0,0 +1,298 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+import uuid
+from datetime import datetime
+
+# stdlib only at import time: the worker starts fast and the app imports this module eagerly
+# same NBA_DATA_DIR override as game_store.DATA_DIR (not imported: it pulls in pandas/pyarrow)
+JOBS_DIR = os.path.join(os.environ.get("NBA_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")),
+                        "jobs")
+WORKER_LOCK = "worker.lock"
+IDLE_EXIT = 3.0      # seconds an idle worker waits for new jobs before exiting
+KEEP_JOBS = 50       # finished jobs (state + log) kept on disk
+ACTIVE = ("queued", "running")
+
+
+def _build_features(progress_cb):
+    from feature_engineering import build_features
+    progress_cb(0.0, "Building features")
+    feats = build_features()
+    return {"rows": len(feats)}
+
+
+def _train(progress_cb, **params):
+    from model_trainer import train_stacked_model
+    return train_stacked_model(progress_cb=progress_cb, **params)
+
+
+# job kind -> function(progress_cb, **params) returning a JSON-serializable result
+JOB_KINDS = {"build_features": _build_features, "train": _train}
+
+
+def _job_path(job_id, jobs_dir=JOBS_DIR):
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def log_path(job_id, jobs_dir=JOBS_DIR):
+    return os.path.join(jobs_dir, f"{job_id}.log")
+
+
+def _write_job(job, jobs_dir=JOBS_DIR):
+    tmp = os.path.join(jobs_dir, f".{job['id']}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(job, fh)
+    os.replace(tmp, _job_path(job["id"], jobs_dir))
+
+
+def load_job(job_id, jobs_dir=JOBS_DIR):
+    with open(_job_path(job_id, jobs_dir), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _update_job(job_id, jobs_dir=JOBS_DIR, **fields):
+    job = load_job(job_id, jobs_dir)
+    job.update(fields)
+    _write_job(job, jobs_dir)
+    return job
+
+
+def list_jobs(limit=None, jobs_dir=JOBS_DIR):
+    """Job states on disk, newest first."""
+    jobs = []
+    for path in glob.glob(os.path.join(jobs_dir, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                jobs.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    jobs.sort(key=lambda j: j["submitted_at"], reverse=True)
+    return jobs[:limit] if limit else jobs
+
+
+def latest_job(kind=None, jobs_dir=JOBS_DIR):
+    """
+    Most recently submitted job (of `kind`, if given), or None. Job ids start
+    with their submit time, so state files are read newest first only until one matches.
+    """
+    for path in sorted(glob.glob(os.path.join(jobs_dir, "*.json")), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                job = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        if kind in (None, job["kind"]):
+            return job
+    return None
+
+
+def active_job(kind=None, jobs_dir=JOBS_DIR):
+    """Oldest queued or running job (of `kind`, if given), or None."""
+    jobs = [j for j in list_jobs(jobs_dir=jobs_dir) if j["status"] in ACTIVE and kind in (None, j["kind"])]
+    return jobs[-1] if jobs else None
+
+
+def read_log(job_id, tail=None, jobs_dir=JOBS_DIR):
+    path = log_path(job_id, jobs_dir)
+    if not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        lines = fh.readlines()
+    return "".join(lines[-tail:] if tail else lines)
+
+
+def submit(kind, params=None, jobs_dir=JOBS_DIR):
+    """
+    Queue a job and make sure a worker process is draining the queue.
+    A job of the same kind that is still queued or running is returned
+    instead of queueing a duplicate (so only one training job exists at a time).
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind {kind!r} — expected one of {sorted(JOB_KINDS)}.")
+    os.makedirs(jobs_dir, exist_ok=True)
+    job = active_job(kind, jobs_dir)
+    if job is None:
+        job = {
+            "id": f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}",
+            "kind": kind, "params": params or {}, "status": "queued",
+            "submitted_at": time.time(), "started_at": None, "finished_at": None,
+            "progress": 0.0, "message": "Queued", "result": None, "error": None, "pid": None,
+        }
+        _write_job(job, jobs_dir)
+    ensure_worker(jobs_dir)
+    return job
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_pid(jobs_dir):
+    try:
+        with open(os.path.join(jobs_dir, WORKER_LOCK), encoding="utf-8") as fh:
+            return int(fh.read().strip() or 0)
+    except (OSError, ValueError):
+        return None
+
+
+def _acquire_lock(jobs_dir):
+    """Take the worker lock (a file holding the worker's pid), clearing it if its owner died."""
+    path = os.path.join(jobs_dir, WORKER_LOCK)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            pid = _lock_pid(jobs_dir)
+            if pid and _pid_alive(pid):
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _release_lock(jobs_dir):
+    if _lock_pid(jobs_dir) == os.getpid():
+        os.remove(os.path.join(jobs_dir, WORKER_LOCK))
+
+
+_WORKER = None  # worker started by this process (polled so it never lingers as a zombie)
+
+
+def ensure_worker(jobs_dir=JOBS_DIR):
+    """Start a detached worker process unless one already holds the worker lock."""
+    global _WORKER
+    if _WORKER is not None and _WORKER.poll() is None:
+        return
+    pid = _lock_pid(jobs_dir)
+    if pid and _pid_alive(pid):
+        return
+    _WORKER = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--jobs-dir", jobs_dir],
+        cwd=os.getcwd(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+
+
+def _next_job(jobs_dir):
+    queued = [j for j in list_jobs(jobs_dir=jobs_dir) if j["status"] == "queued"]
+    return queued[-1] if queued else None
+
+
+def _recover(jobs_dir):
+    """Fail jobs left 'running' by a worker that died, and prune old finished jobs."""
+    jobs = list_jobs(jobs_dir=jobs_dir)
+    for job in jobs:
+        if job["status"] == "running":
+            _update_job(job["id"], jobs_dir, status="failed", finished_at=time.time(),
+                        error="Interrupted — the worker process exited.")
+    finished = [j for j in jobs if j["status"] not in ACTIVE]
+    for job in finished[KEEP_JOBS:]:
+        for path in (_job_path(job["id"], jobs_dir), log_path(job["id"], jobs_dir)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def run_worker(jobs_dir=JOBS_DIR):
+    """
+    Drain the queue one job at a time, each in its own child process with
+    stdout/stderr going to the job's log. Exits after IDLE_EXIT seconds
+    without work; only one worker runs (see WORKER_LOCK).
+    """
+    os.makedirs(jobs_dir, exist_ok=True)
+    if not _acquire_lock(jobs_dir):
+        return
+    try:
+        _recover(jobs_dir)
+        idle_since = time.monotonic()
+        while True:
+            job = _next_job(jobs_dir)
+            if job is None:
+                if time.monotonic() - idle_since > IDLE_EXIT:
+                    break
+                time.sleep(0.5)
+                continue
+            # from here on only the job process writes its state file, until it exits
+            _update_job(job["id"], jobs_dir, status="running", started_at=time.time(),
+                        message="Starting", pid=os.getpid())
+            with open(log_path(job["id"], jobs_dir), "ab") as log:
+                code = subprocess.call(
+                    [sys.executable, os.path.abspath(__file__), "--run", job["id"], "--jobs-dir", jobs_dir],
+                    stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                    env={**os.environ, "PYTHONUNBUFFERED": "1"},
+                )
+            job = load_job(job["id"], jobs_dir)
+            if job["status"] == "running":
+                _update_job(job["id"], jobs_dir, status="failed", finished_at=time.time(),
+                            error=f"Job process exited with code {code}.")
+            idle_since = time.monotonic()
+    finally:
+        _release_lock(jobs_dir)
+    # a job queued while this worker was shutting down still gets a worker
+    if _next_job(jobs_dir) is not None:
+        run_worker(jobs_dir)
+
+
+def run_job(job_id, jobs_dir=JOBS_DIR):
+    """Execute one job in this process, writing progress and the outcome to its state file."""
+    job = load_job(job_id, jobs_dir)
+    last = [None]
+
+    def progress_cb(fraction, message=None):
+        fraction = round(min(max(fraction, 0.0), 1.0), 3)
+        if (fraction, message) != last[0]:
+            last[0] = (fraction, message)
+            _update_job(job_id, jobs_dir, progress=fraction, message=message or job["kind"])
+
+    print(f"▶️ {job['kind']} job {job_id} started (pid {os.getpid()})")
+    try:
+        result = JOB_KINDS[job["kind"]](progress_cb, **job["params"])
+    except Exception as e:
+        traceback.print_exc()
+        _update_job(job_id, jobs_dir, status="failed", finished_at=time.time(), error=str(e))
+        print(f"❌ {job['kind']} job {job_id} failed: {e}")
+        return 1
+    _update_job(job_id, jobs_dir, status="done", finished_at=time.time(),
+                progress=1.0, message="Done", result=result)
+    print(f"✅ {job['kind']} job {job_id} done")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background feature/training job runner")
+    parser.add_argument("--jobs-dir", default=JOBS_DIR)
+    parser.add_argument("--worker", action="store_true", help="drain the job queue")
+    parser.add_argument("--run", metavar="JOB_ID", help="execute a single job (used by the worker)")
+    parser.add_argument("--submit", choices=sorted(JOB_KINDS), help="queue a job and start a worker")
+    args = parser.parse_args(argv)
+    if args.run:
+        return run_job(args.run, args.jobs_dir)
+    if args.worker:
+        run_worker(args.jobs_dir)
+        return 0
+    if args.submit:
+        job = submit(args.submit, jobs_dir=args.jobs_dir)
+        print(f"Job {job['id']} ({job['kind']}) is {job['status']} — log: {log_path(job['id'], args.jobs_dir)}")
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import data_fetcher
+import model_predictor as mp
+
+POLL_INTERVAL = 20  # seconds between scoreboard polls
+GAME_KEY = ["home_team", "away_team", "start_time"]
+GAME_STATE = ["status", "home_score", "away_score"]
+PREDICTION_COLUMNS = mp.PREDICTION_COLUMNS
+
+
+def prediction_context():
+    """What a prediction depends on besides the game itself: the model files and the team state."""
+    state = mp.get_team_state()
+    return mp.REGISTRY.fingerprint(), state.last_date, state.applied
+
+
+def board_states(board):
+    """{game key: (status, home_score, away_score)} for a live scoreboard frame."""
+    if board.empty:
+        return {}
+    keys = board[GAME_KEY].astype(str).itertuples(index=False, name=None)
+    states = board[GAME_STATE].astype(str).itertuples(index=False, name=None)
+    return dict(zip(keys, states))
+
+
+class LivePoller:
+    """
+    Daemon thread that polls the live scoreboard every `interval` seconds,
+    diffs it against the previous board and re-predicts only games that are
+    new or whose status/score changed (every game when the model version or
+    the team state moved). Each cycle publishes an immutable snapshot dict
+    (games, predictions, version, updated_at, error, pending) that readers
+    take without blocking on ESPN or the models. The first cycle also
+    publishes the board on its own (pending=True) before loading the models
+    and scoring, so the scoreboard can render while predictions are computed.
+    """
+
+    def __init__(self, interval=POLL_INTERVAL, fetch=data_fetcher.get_live_scoreboard,
+                 predict=mp.predict_today, context=prediction_context):
+        self.interval = interval
+        self.fetch = fetch
+        self.predict = predict
+        self.context = context
+        self._states = {}
+        self._predictions = {}   # game key -> prediction row (tuple of PREDICTION_COLUMNS)
+        self._context = None
+        self._snapshot = None
+        self._ready = threading.Event()    # a board has been published
+        self._scored = threading.Event()   # a board with predictions has been published
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"polls": 0, "changed_games": 0, "predicted_games": 0, "last_poll_seconds": None}
+
+    def poll_once(self):
+        """One fetch -> diff -> predict -> publish cycle; returns the new snapshot."""
+        t0 = time.perf_counter()
+        board = self.fetch()
+        states = board_states(board)
+        changed = {k for k, s in states.items() if self._states.get(k) != s}
+        error = None
+        try:
+            context = self.context()
+        except Exception as e:
+            context, error = None, str(e)
+        if context != self._context:
+            self._predictions.clear()
+            self._context = context
+
+        keys = list(states)
+        todo = [i for i, k in enumerate(keys) if k in changed or k not in self._predictions]
+        if self._snapshot is None and todo and context is not None:
+            self._publish(board, [], None, pending=True)
+        if todo and context is not None:
+            try:
+                preds = self.predict(board.iloc[todo].reset_index(drop=True))
+                for i, row in zip(todo, preds[PREDICTION_COLUMNS].itertuples(index=False, name=None)):
+                    self._predictions[keys[i]] = row
+                self.stats["predicted_games"] += len(todo)
+            except Exception as e:
+                error = str(e)
+        for k in set(self._predictions) - set(states):
+            del self._predictions[k]
+        self._states = states
+
+        rows = [self._predictions[k] for k in keys if k in self._predictions]
+        self.stats["polls"] += 1
+        self.stats["changed_games"] += len(changed)
+        self.stats["last_poll_seconds"] = time.perf_counter() - t0
+        return self._publish(board, rows, error)
+
+    def _publish(self, board, rows, error, pending=False):
+        version = self._snapshot["version"] + 1 if self._snapshot else 1
+        self._snapshot = {
+            "games": board,
+            "predictions": pd.DataFrame(rows, columns=PREDICTION_COLUMNS),
+            "version": version,
+            "updated_at": datetime.now(),
+            "error": error,
+            "pending": pending,
+        }
+        self._ready.set()
+        if not pending:
+            self._scored.set()
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Live poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self, timeout=None, scored=False):
+        """
+        Latest published snapshot (None before the first poll unless `timeout`
+        allows waiting). With `scored`, waits for the first snapshot that
+        carries predictions rather than the first board.
+        """
+        if timeout:
+            (self._scored if scored else self._ready).wait(timeout)
+        return self._snapshot
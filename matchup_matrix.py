@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+# slot for teams the state has never seen (they all get the default rolling stats)
+UNKNOWN_TEAM = "(unknown)"
+
+
+def combine_rows(market, home_rows, away_rows):
+    """
+    Game-level prediction from the home-team and away-team rows of a market:
+    P(home wins) averages the home win prob with the away loss prob, the home
+    margin averages the home margin with the negated away margin, and the
+    total averages both rows' totals.
+    """
+    if market == "moneyline":
+        return (home_rows + 1 - away_rows) / 2
+    if market == "margin":
+        return (home_rows - away_rows) / 2
+    return (home_rows + away_rows) / 2
+
+
+class MatchupTable:
+    """
+    One immutable snapshot of the pair predictions: `teams`, their `index`
+    and the per-market matrices always belong together. MatchupMatrix.refresh
+    builds a new table and swaps it in with a single assignment, so a reader
+    holding a table never mixes a new team index with old matrices.
+    """
+
+    __slots__ = ("teams", "index", "markets", "matrix")
+
+    def __init__(self, teams, markets):
+        self.teams = teams
+        self.index = {t: i for i, t in enumerate(teams)}
+        self.markets = markets
+        self.matrix = markets.get("moneyline", np.empty((0, 0)))
+
+    @property
+    def known_teams(self):
+        return [t for t in self.teams if t != UNKNOWN_TEAM]
+
+    def _positions(self, teams):
+        unknown = self.index[UNKNOWN_TEAM]
+        return np.fromiter((self.index.get(t, unknown) for t in teams), dtype=np.intp, count=len(teams))
+
+    def lookup(self, home_teams, away_teams):
+        """Home-win probabilities for parallel lists of home and away teams."""
+        home_teams, away_teams = list(home_teams), list(away_teams)
+        return self.matrix[self._positions(home_teams), self._positions(away_teams)]
+
+    def lookup_markets(self, home_teams, away_teams):
+        """{market: predictions} for parallel lists of home and away teams."""
+        home, away = self._positions(list(home_teams)), self._positions(list(away_teams))
+        return {market: values[home, away] for market, values in self.markets.items()}
+
+    def home_win_prob(self, home_team, away_team):
+        unknown = self.index[UNKNOWN_TEAM]
+        return float(self.matrix[self.index.get(home_team, unknown), self.index.get(away_team, unknown)])
+
+    def frame(self, market="moneyline"):
+        """Known-team matrix of a market as a DataFrame (rows: home team, columns: away team)."""
+        known = self.known_teams
+        idx = self._positions(known)
+        return pd.DataFrame(self.markets[market][np.ix_(idx, idx)], index=known, columns=known)
+
+
+class MatchupMatrix:
+    """
+    Home-win probability, plus home margin and game total when the model has
+    those markets, for every (home, away) pair of known teams, scored in one
+    vectorized batch (two team-perspective rows per pair) and combined with
+    combine_rows. `table` is the current MatchupTable (`matrix` is its
+    moneyline; `markets` maps every market to its matrix); lookups here read
+    the table once per call.
+    Refreshes rescore only the pairs involving a team whose rolling stats or
+    ratings changed; a new model version or team set rescores every pair.
+    """
+
+    def __init__(self):
+        self.table = MatchupTable([], {})
+        self._signatures = {}
+        self._scorer = None
+        self._columns = None
+        self._state_key = None
+        self.metrics = {"refreshes": 0, "rescored_pairs": 0}
+
+    @property
+    def teams(self):
+        return self.table.teams
+
+    @property
+    def markets(self):
+        return self.table.markets
+
+    @property
+    def matrix(self):
+        return self.table.matrix
+
+    @property
+    def known_teams(self):
+        return self.table.known_teams
+
+    def refresh(self, state, scorer, columns, as_of=None):
+        """
+        Bring the matrix up to date with `state` and `scorer` for games on
+        `as_of` (see TeamState.matchup_features); returns the number of pairs rescored.
+        """
+        state_key = (state.applied, state.last_date, as_of)
+        columns = list(columns)
+        if scorer is self._scorer and columns == self._columns and state_key == self._state_key:
+            return 0
+        teams = sorted(state.teams) + [UNKNOWN_TEAM]
+        signatures = {t: state.team_signature(t, as_of) for t in teams}
+        n = len(teams)
+        current = self.table
+        if scorer is not self._scorer or columns != self._columns or teams != current.teams:
+            markets = {}
+            stale = np.ones((n, n), dtype=bool)
+        else:
+            # copies: readers may still hold the current table
+            markets = {market: values.copy() for market, values in current.markets.items()}
+            changed = np.array([self._signatures.get(t) != signatures[t] for t in teams])
+            stale = changed[:, None] | changed[None, :]
+
+        home_idx, away_idx = np.nonzero(stale)
+        if len(home_idx):
+            feats = state.matchup_features([teams[i] for i in home_idx], [teams[j] for j in away_idx], as_of)
+            preds = scorer.predict_markets(feats[columns].to_numpy(dtype=float))
+            m = len(home_idx)
+            for market, rows in preds.items():
+                values = markets.setdefault(market, np.empty((n, n)))
+                values[home_idx, away_idx] = combine_rows(market, rows[:m], rows[m:])
+
+        self.table = MatchupTable(teams, markets)
+        self._signatures = signatures
+        self._scorer = scorer
+        self._columns = columns
+        self._state_key = state_key
+        self.metrics["refreshes"] += 1
+        self.metrics["rescored_pairs"] += len(home_idx)
+        return len(home_idx)
+
+    def lookup(self, home_teams, away_teams):
+        return self.table.lookup(home_teams, away_teams)
+
+    def lookup_markets(self, home_teams, away_teams):
+        return self.table.lookup_markets(home_teams, away_teams)
+
+    def home_win_prob(self, home_team, away_team):
+        return self.table.home_win_prob(home_team, away_team)
+
+    def frame(self, market="moneyline"):
+        return self.table.frame(market)
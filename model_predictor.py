@@ -1,45 +1,90 @@
-import os, joblib, pandas as pd, numpy as np
-import xgboost as xgb
+import threading, time, pandas as pd, numpy as np
+from datetime import datetime
 
-MODELS_DIR = "models"
-SCALER_PATH = os.path.join(MODELS_DIR, "scaler.pkl")
+from feature_engineering import MODEL_FEATURES
+from matchup_matrix import MatchupMatrix, combine_rows
+from model_registry import ModelRegistry, MODELS_DIR
+from team_state import load_team_state, sync_team_state
+
+REGISTRY = ModelRegistry(MODELS_DIR)
+PREDICTION_COLUMNS = ["home_team", "away_team", "predicted_winner", "home_win_prob_%", "confidence_%",
+                      "home_margin", "total_points"]
 
 def load_models():
-    """Load base and meta ensemble models."""
-    required = ["xgb", "rf", "lr", "meta_stacker"]
-    models = {}
-    for name in required:
-        path = os.path.join(MODELS_DIR, f"{name}.pkl")
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Missing model: {path}")
-        models[name] = joblib.load(path)
-    scaler = joblib.load(SCALER_PATH)
-    return models, scaler
-
-
-def prepare_features_for_prediction(live_df):
+    """Base and meta ensemble models of the current version (cached in memory)."""
+    return REGISTRY.get()
+
+
+_TEAM_STATE = None
+_STATE_LOCK = threading.Lock()
+
+
+def get_team_state():
+    """Process-wide online team state (loaded once, topped up from the game store)."""
+    global _TEAM_STATE
+    with _STATE_LOCK:
+        if _TEAM_STATE is None:
+            _TEAM_STATE = load_team_state()
+        return _TEAM_STATE
+
+
+def update_team_state(games):
+    """Feed newly final scores (e.g. get_historical_games()) into the team state."""
+    get_team_state()
+    with _STATE_LOCK:
+        state = _TEAM_STATE  # read under the lock: refresh_team_state may have swapped in a rebuilt state
+        if state.update_from_games(games):
+            state.save()
+    return state
+
+
+def refresh_team_state():
+    """Re-sync the team state with the game store (after a collection added or backfilled games)."""
+    global _TEAM_STATE
+    with _STATE_LOCK:
+        _TEAM_STATE = load_team_state() if _TEAM_STATE is None else sync_team_state(_TEAM_STATE)
+        return _TEAM_STATE
+
+
+def game_day():
+    """YYYYMMDD of today's slate: the as-of date for live rating features."""
+    return datetime.now().strftime("%Y%m%d")
+
+
+_MATRIX = MatchupMatrix()
+_MATRIX_LOCK = threading.Lock()
+
+
+def get_matchup_matrix():
     """
-    Temporary feature generator for live games until
-    rolling stats integration (Phase V).
+    Predictions of every market for every home/away pair, kept up to date with the
+    current model version and team state (rescoring only teams that changed).
+    Returns the refreshed MatchupTable: a consistent snapshot that a concurrent
+    refresh (poller vs what-if picker) never changes under the caller.
     """
-    placeholder = []
-    for _, _ in live_df.iterrows():
-        placeholder.append({
-            "is_home": 1,
-            "avg_pts_5": 111, "avg_pa_5": 108, "win_rate_5": 0.55,
-            "avg_pts_10": 112, "avg_pa_10": 109, "win_rate_10": 0.56
-        })
-    return pd.DataFrame(placeholder)
-
-
-def predict_today(live_df):
-    """Predict Moneyline outcomes for today's games."""
-    models, scaler = load_models()
-    if live_df.empty:
-        return pd.DataFrame()
+    scorer = REGISTRY.scorer()
+    get_team_state()
+    with _MATRIX_LOCK, _STATE_LOCK:
+        _MATRIX.refresh(_TEAM_STATE, scorer, REGISTRY.features, game_day())
+        return _MATRIX.table
+
+
+def prepare_features_for_prediction(live_df, state=None, columns=None, as_of=None):
+    """
+    Features for live games on `as_of` (default: today) from the online team
+    state (rolling stats and ratings): one home-team row (is_home=1) per game,
+    then one away-team row (is_home=0), restricted to `columns` (default: the
+    current model's list).
+    """
+    state = state or get_team_state()
+    feats = state.matchup_features(live_df["home_team"].tolist(), live_df["away_team"].tolist(),
+                                   as_of or game_day())
+    return feats[columns or REGISTRY.features or MODEL_FEATURES]
+
 
-    feats = prepare_features_for_prediction(live_df)
-    X = scaler.transform(feats)
+def stacked_proba(models, scaler, X):
+    """Reference scoring path: scaler -> three base predict_proba -> meta learner."""
+    X = scaler.transform(X)
 
     # Level‑0 predictions
     meta_inputs = np.column_stack([
@@ -49,11 +94,45 @@ def predict_today(live_df):
     ])
 
     # Meta learner output
-    final_probs = models["meta_stacker"].predict_proba(meta_inputs)[:, 1]
+    return models["meta_stacker"].predict_proba(meta_inputs)[:, 1]
+
+
+def stacked_markets(models, scaler, X, markets):
+    """Reference scoring path for every market: {"moneyline": P(win), <market>: prediction}."""
+    out = {"moneyline": stacked_proba(models, scaler, X)}
+    X = scaler.transform(X)
+    for market, spec in markets.items():
+        meta_inputs = np.column_stack([models[name].predict(X) for name in spec["base"]])
+        out[market] = models[spec["meta"]].predict(meta_inputs)
+    return out
+
+
+def predict_today(live_df, fused=True):
+    """
+    Predict today's games: moneyline winner and probability, plus the home
+    team's margin (spread) and the game total when the model has those markets.
+    `fused` reads the precomputed matchup matrix (scored through the
+    registry's FusedScorer); otherwise every game goes through stacked_markets.
+    """
+    models, scaler = load_models()
+    if live_df.empty:
+        return pd.DataFrame()
+
+    t0 = time.perf_counter()
+    n = len(live_df)
+    if fused:
+        preds = get_matchup_matrix().lookup_markets(live_df["home_team"], live_df["away_team"])
+    else:
+        rows = stacked_markets(models, scaler, prepare_features_for_prediction(live_df).values, REGISTRY.markets)
+        preds = {market: combine_rows(market, values[:n], values[n:]) for market, values in rows.items()}
+    final_probs = preds["moneyline"]
     predicted = np.where(final_probs > 0.5, "HOME", "AWAY")
     conf = np.round(np.abs(final_probs - 0.5) * 200, 1)
+    REGISTRY.record_predict(time.perf_counter() - t0, n)
 
     live_df["predicted_winner"] = predicted
     live_df["home_win_prob_%"] = np.round(final_probs * 100, 2)
     live_df["confidence_%"] = conf
-    return live_df[["home_team", "away_team", "predicted_winner", "home_win_prob_%", "confidence_%"]]
+    live_df["home_margin"] = np.round(preds.get("margin", np.full(n, np.nan)), 1)
+    live_df["total_points"] = np.round(preds.get("total", np.full(n, np.nan)), 1)
+    return live_df[PREDICTION_COLUMNS]
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+
+from fast_scorer import FusedScorer
+from feature_engineering import feature_columns
+
+MODELS_DIR = "models"
+MODEL_NAMES = ["xgb", "rf", "lr", "meta_stacker"]
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+FEATURES_FILE = "features.json"
+MARKETS_FILE = "markets.json"
+# model sets saved before features.json existed were trained on the rolling columns only
+LEGACY_FEATURES = feature_columns()
+
+
+def new_version_dir(models_dir=MODELS_DIR):
+    """Create an empty directory for a new model set under models/versions."""
+    version = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    path = os.path.join(models_dir, VERSIONS_DIR, version)
+    os.makedirs(path)
+    return path
+
+
+def is_complete_version(version_dir):
+    """True when every moneyline pickle and the scaler of a version are on disk."""
+    return all(os.path.exists(os.path.join(version_dir, f"{name}.pkl")) for name in MODEL_NAMES + ["scaler"])
+
+
+def publish_version(version_dir, models_dir=MODELS_DIR, keep=3):
+    """
+    Atomically point models/CURRENT at a fully written version directory,
+    then drop all but the `keep` newest complete versions (never the current one).
+    """
+    version = os.path.basename(os.path.normpath(version_dir))
+    tmp = os.path.join(models_dir, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(version)
+    os.replace(tmp, os.path.join(models_dir, CURRENT_FILE))
+
+    versions_root = os.path.join(models_dir, VERSIONS_DIR)
+    # incomplete directories (a retrain still running, or one killed mid-save) neither count nor go
+    old = sorted(v for v in os.listdir(versions_root)
+                 if v != version and is_complete_version(os.path.join(versions_root, v)))
+    for stale in old[:max(0, len(old) - (keep - 1))]:
+        shutil.rmtree(os.path.join(versions_root, stale), ignore_errors=True)
+
+
+def save_feature_list(version_dir, features):
+    """Record the model input columns (in training order) next to the pickles."""
+    with open(os.path.join(version_dir, FEATURES_FILE), "w", encoding="utf-8") as fh:
+        json.dump(list(features), fh)
+
+
+def load_feature_list(model_dir):
+    path = os.path.join(model_dir, FEATURES_FILE)
+    if not os.path.exists(path):
+        return list(LEGACY_FEATURES)
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_markets(version_dir, markets, metrics):
+    """Record the point-market heads ({market: {"base": [...], "meta": name}}) and the training report."""
+    with open(os.path.join(version_dir, MARKETS_FILE), "w", encoding="utf-8") as fh:
+        json.dump({"markets": markets, "metrics": metrics}, fh)
+
+
+def load_markets(model_dir):
+    """(markets, training metrics); model sets saved before markets.json only have the moneyline."""
+    path = os.path.join(model_dir, MARKETS_FILE)
+    if not os.path.exists(path):
+        return {}, None
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return data["markets"], data["metrics"]
+
+
+def current_model_dir(models_dir=MODELS_DIR):
+    """Directory of the published model set (falls back to flat files in models/)."""
+    pointer = os.path.join(models_dir, CURRENT_FILE)
+    if os.path.exists(pointer):
+        with open(pointer, encoding="utf-8") as fh:
+            version = fh.read().strip()
+        if version:
+            return os.path.join(models_dir, VERSIONS_DIR, version)
+    return models_dir
+
+
+class ModelRegistry:
+    """
+    Keeps the published model set in memory across Streamlit reruns.
+    Each get() only stats the CURRENT pointer and the pickles; models are
+    reloaded when the pointer moves or a file's mtime/size changes.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR):
+        self.models_dir = models_dir
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._scorer = None
+        self._fingerprint = None
+        self.version = None
+        self.features = None
+        self.markets = {}
+        self.training_metrics = None
+        self.metrics = {
+            "loads": 0, "last_load_seconds": None,
+            "predict_calls": 0, "predict_rows": 0,
+            "last_predict_seconds": None, "total_predict_seconds": 0.0,
+        }
+
+    def _files(self, model_dir):
+        return [os.path.join(model_dir, f"{name}.pkl") for name in MODEL_NAMES + ["scaler"]]
+
+    def fingerprint(self):
+        model_dir = current_model_dir(self.models_dir)
+        stats = []
+        for path in self._files(model_dir):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Missing model: {path}")
+            st = os.stat(path)
+            stats.append((st.st_mtime_ns, st.st_size))
+        return model_dir, tuple(stats)
+
+    def get(self):
+        """(models, scaler) for the current version, loading only on change."""
+        with self._lock:
+            fingerprint = self.fingerprint()
+            if self._loaded is None or fingerprint != self._fingerprint:
+                t0 = time.perf_counter()
+                model_dir = fingerprint[0]
+                markets, training_metrics = load_markets(model_dir)
+                names = MODEL_NAMES + [name for spec in markets.values() for name in spec["base"] + [spec["meta"]]]
+                models = {name: joblib.load(os.path.join(model_dir, f"{name}.pkl")) for name in names}
+                scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+                self._loaded = (models, scaler)
+                self.features = load_feature_list(model_dir)
+                self.markets = markets
+                self.training_metrics = training_metrics
+                self._scorer = None
+                self._fingerprint = fingerprint
+                self.version = os.path.basename(os.path.normpath(model_dir))
+                self.metrics["loads"] += 1
+                self.metrics["last_load_seconds"] = time.perf_counter() - t0
+            return self._loaded
+
+    def scorer(self):
+        """FusedScorer for the current version, built once per load."""
+        self.get()
+        with self._lock:
+            if self._scorer is None:
+                self._scorer = FusedScorer(*self._loaded, markets=self.markets)
+            return self._scorer
+
+    def record_predict(self, seconds, rows):
+        with self._lock:
+            self.metrics["predict_calls"] += 1
+            self.metrics["predict_rows"] += rows
+            self.metrics["last_predict_seconds"] = seconds
+            self.metrics["total_predict_seconds"] += seconds
@@ -1,120 +1,195 @@
 import os
+import shutil
+import time
 import pandas as pd
 import numpy as np
 import joblib
-from sklearn.model_selection import train_test_split, KFold
+from sklearn.model_selection import KFold
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
 import xgboost as xgb
-from sklearn.metrics import accuracy_score, roc_auc_score, f1_score
+from sklearn.metrics import accuracy_score, roc_auc_score, f1_score, mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 
-def build_features(input_csv="data/nba_games_5yr.csv", output_csv="data/features_ready.csv"):
-    """
-    Create model-ready features from multi-season game data.
-    Generates rolling stats, opponent differentials, and context flags.
-    Output: features_ready.csv
-    """
-    if not os.path.exists(input_csv):
-        raise FileNotFoundError(f"{input_csv} not found.")
+import game_store
+from training_scheduler import run_base_models
+from feature_engineering import build_features, MODEL_FEATURES
+from fast_scorer import FusedScorer
+from model_registry import new_version_dir, publish_version, save_feature_list, save_markets
+
+# Base models: (name, estimator class, hyperparameters); n_jobs is set per fit by the scheduler
+BASE_MODEL_SPECS = [
+    ("xgb", xgb.XGBClassifier, dict(
+        n_estimators=300, learning_rate=0.05, max_depth=5,
+        subsample=0.8, colsample_bytree=0.8, eval_metric="logloss",
+        random_state=42
+    )),
+    ("rf", RandomForestClassifier, dict(
+        n_estimators=200, max_depth=8, random_state=42
+    )),
+    ("lr", LogisticRegression, dict(max_iter=1000, solver="liblinear")),
+]
+META_PARAMS = dict(
+    n_estimators=250, learning_rate=0.1, max_depth=3,
+    subsample=0.9, colsample_bytree=0.9, random_state=42,
+    eval_metric="logloss"
+)
+
+# Point-based markets, per team-game row: own margin (spread) and game total.
+# Each is a stack of regressors fed to a linear meta learner, trained on the
+# same scaled features and CV folds as the moneyline ensemble.
+REGRESSION_PARAMS = dict(
+    n_estimators=300, learning_rate=0.05, max_depth=4,
+    subsample=0.8, colsample_bytree=0.8, random_state=42
+)
+MARKET_SPECS = {
+    "margin": [
+        ("margin_xgb", xgb.XGBRegressor, REGRESSION_PARAMS),
+        ("margin_ridge", Ridge, dict(alpha=1.0)),
+    ],
+    "total": [
+        ("total_xgb", xgb.XGBRegressor, REGRESSION_PARAMS),
+        ("total_ridge", Ridge, dict(alpha=1.0)),
+    ],
+}
 
-    df = pd.read_csv(input_csv)
-    df = df.dropna(subset=["home_score", "away_score"]).reset_index(drop=True)
-    df["home_win"] = (df["home_score"] > df["away_score"]).astype(int)
-    team_stats = []
 
-    for team in pd.unique(df[["home_team", "away_team"]].values.ravel()):
-        team_games = df[(df["home_team"] == team) | (df["away_team"] == team)].copy()
-        team_games = team_games.sort_values("date")
-        team_games["points_for"] = np.where(team_games["home_team"] == team,
-                                            team_games["home_score"], team_games["away_score"])
-        team_games["points_against"] = np.where(team_games["home_team"] == team,
-                                                team_games["away_score"], team_games["home_score"])
-        team_games["win_flag"] = (team_games["points_for"] > team_games["points_against"]).astype(int)
-        for n in [5, 10]:
-            team_games[f"avg_pts_{n}"] = team_games["points_for"].rolling(n, min_periods=1).mean().shift(1)
-            team_games[f"avg_pa_{n}"] = team_games["points_against"].rolling(n, min_periods=1).mean().shift(1)
-            team_games[f"win_rate_{n}"] = team_games["win_flag"].rolling(n, min_periods=1).mean().shift(1)
-        team_games["is_home"] = (team_games["home_team"] == team).astype(int)
-        team_games["team_name"] = team
-        team_stats.append(team_games)
+def market_targets(df):
+    """Per-row targets of every market: win_flag, point margin and game total."""
+    points_for = df["points_for"].astype(float).values
+    points_against = df["points_against"].astype(float).values
+    return {
+        "moneyline": df["win_flag"].values,
+        "margin": points_for - points_against,
+        "total": points_for + points_against,
+    }
 
-    combined = pd.concat(team_stats).sort_values("date").reset_index(drop=True)
-    combined = combined.dropna().reset_index(drop=True)
-    feature_cols = [
-        "date", "team_name", "is_home", "avg_pts_5", "avg_pa_5", "win_rate_5",
-        "avg_pts_10", "avg_pa_10", "win_rate_10", "points_for", "points_against", "win_flag"
-    ]
-    feats = combined[feature_cols].copy().dropna()
-    feats.to_csv(output_csv, index=False)
-    print(f"✅ Features ready: {output_csv} - {len(feats)} rows.")
-    return feats
 
-def train_stacked_model(input_csv="data/features_ready.csv", models_dir="models"):
+def _regression_metrics(y_true, y_pred):
+    return {
+        "mae": mean_absolute_error(y_true, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+    }
+
+def train_stacked_model(input_csv=None, models_dir="models", store_dir=game_store.STORE_DIR,
+                        base_params=None, use_cache=True, max_workers=None, progress_cb=None):
     """
-    Train stacked ensemble (XGBoost + RF + Logistic -> meta-XGBoost)
-    for Moneyline (win/loss) prediction.
-    Saves final model files under /models.
+    Train stacked ensembles for the moneyline (XGBoost + RF + Logistic ->
+    meta-XGBoost), margin and total markets (XGBoost + Ridge -> linear meta)
+    in one pass: a single feature matrix, scaler, chronological split and set
+    of CV folds, with every (model, fold) fit in the same process pool.
+    Reads features from the feature store (or `input_csv` if given).
+    Saves final model files into a new models/versions/<id> directory and
+    publishes it via models/CURRENT once every file is written.
+    `base_params` overrides hyperparameters per base model ({"rf": {...}});
+    with `use_cache`, base models whose data/params are unchanged are not refit.
+    `progress_cb(fraction, message)` follows the run fold by fold (base
+    fits cover 0-90%, meta learners and saving the rest).
+    Returns {market: metrics}, each with the test-set scores, fit_seconds
+    (base + meta fits) and predict_ms (test set, through the fused scorer).
     """
-    if not os.path.exists(input_csv):
-        raise FileNotFoundError(f"{input_csv} not found.")
+    def progress(fraction, message):
+        if progress_cb:
+            progress_cb(fraction, message)
+
+    if input_csv is not None:
+        if not os.path.exists(input_csv):
+            raise FileNotFoundError(f"{input_csv} not found.")
+        df = pd.read_csv(input_csv)
+    else:
+        df = game_store.read_features(store_dir=store_dir)
+        if df is None:
+            raise FileNotFoundError("No features in the store — build features first.")
     os.makedirs(models_dir, exist_ok=True)
 
-    df = pd.read_csv(input_csv)
-    X = df[["is_home", "avg_pts_5", "avg_pa_5", "win_rate_5",
-            "avg_pts_10", "avg_pa_10", "win_rate_10"]].values
-    y = df["win_flag"].values
+    missing = [c for c in MODEL_FEATURES if c not in df.columns]
+    if missing:
+        raise ValueError(f"Features are missing {missing} — rebuild features first.")
+    X_raw = df[MODEL_FEATURES].values
+    targets = market_targets(df)
 
     scaler = StandardScaler()
-    X = scaler.fit_transform(X)
-
-    # chronological split
-    X_train, X_test, y_train, y_test = train_test_split(X, y,
-                                                       test_size=0.15,
-                                                       shuffle=False)
-
-    # Base models
-    model_xgb = xgb.XGBClassifier(
-        n_estimators=300, learning_rate=0.05, max_depth=5,
-        subsample=0.8, colsample_bytree=0.8, eval_metric="logloss",
-        random_state=42, n_jobs=-1
-    )
-    model_rf = RandomForestClassifier(
-        n_estimators=200, max_depth=8, random_state=42, n_jobs=-1
-    )
-    model_lr = LogisticRegression(max_iter=1000, solver="liblinear")
-    base_models = [("xgb", model_xgb), ("rf", model_rf), ("lr", model_lr)]
+    X = scaler.fit_transform(X_raw)
 
-    # Out-of-fold meta features
-    kf = KFold(n_splits=5, shuffle=True, random_state=42)
-    meta_features = np.zeros((X_train.shape[0], len(base_models)))
-    test_meta = np.zeros((X_test.shape[0], len(base_models)))
+    # chronological split, shared by every market
+    n_train = len(X) - int(np.ceil(0.15 * len(X)))
+    X_train, X_test = X[:n_train], X[n_train:]
+    y_train = {market: y[:n_train] for market, y in targets.items()}
+    y_test = {market: y[n_train:] for market, y in targets.items()}
 
-    for idx, (name, model) in enumerate(base_models):
-        print(f"Training base model: {name}")
-        oof_preds = np.zeros(X_train.shape[0])
-        for fold, (train_idx, val_idx) in enumerate(kf.split(X_train, y_train)):
-            model.fit(X_train[train_idx], y_train[train_idx])
-            oof_preds[val_idx] = model.predict_proba(X_train[val_idx])[:, 1]
-        meta_features[:, idx] = oof_preds
-        test_meta[:, idx] = model.predict_proba(X_test)[:, 1]
-        joblib.dump(model, os.path.join(models_dir, f"{name}.pkl"))
+    # Out-of-fold meta features: (model, fold) fits of all markets run in one
+    # pool over the same folds; unchanged models come from cache
+    folds = list(KFold(n_splits=5, shuffle=True, random_state=42).split(X_train))
+    market_specs = {"moneyline": BASE_MODEL_SPECS, **MARKET_SPECS}
+    market_specs = {
+        market: [(name, cls, {**params, **(base_params or {}).get(name, {})}) for name, cls, params in specs]
+        for market, specs in market_specs.items()
+    }
+    specs = [spec for market_list in market_specs.values() for spec in market_list]
+    names = {market: [name for name, _, _ in market_list] for market, market_list in market_specs.items()}
+    timings = {}
+    progress(0.0, "Fitting base models")
+    base = run_base_models(specs, X_train, y_train["moneyline"], X_test, folds,
+                           cache_dir=os.path.join(models_dir, "cache") if use_cache else None,
+                           max_workers=max_workers,
+                           targets={name: y_train[market] for market, market_names in names.items()
+                                    for name in market_names},
+                           timings=timings,
+                           progress_cb=lambda frac, message: progress(0.9 * frac, message))
+    # the version directory only exists from here on, and only complete sets survive:
+    # publish_version's prune would count a partial one as a kept version
+    version_dir = new_version_dir(models_dir)
+    try:
+        for name, (_, _, model) in base.items():
+            joblib.dump(model, os.path.join(version_dir, f"{name}.pkl"))
 
-    # Meta learner (XGBoost)
-    meta_model = xgb.XGBClassifier(
-        n_estimators=250, learning_rate=0.1, max_depth=3,
-        subsample=0.9, colsample_bytree=0.9, random_state=42,
-        eval_metric="logloss"
-    )
-    print("Training meta-learner...")
-    meta_model.fit(meta_features, y_train)
-    final_preds = meta_model.predict(test_meta)
-    acc = accuracy_score(y_test, final_preds)
-    auc = roc_auc_score(y_test, final_preds)
-    f1 = f1_score(y_test, final_preds)
+        # Meta learners: XGBoost for the moneyline, linear blends for the point markets
+        report = {}
+        models = {name: model for name, (_, _, model) in base.items()}
+        print("Training meta-learners...")
+        progress(0.9, "Fitting meta learners")
+        for market, market_names in names.items():
+            meta_features = np.column_stack([base[name][0] for name in market_names])
+            test_meta = np.column_stack([base[name][1] for name in market_names])
+            meta_model = xgb.XGBClassifier(**META_PARAMS) if market == "moneyline" else LinearRegression()
+            t0 = time.perf_counter()
+            meta_model.fit(meta_features, y_train[market])
+            fit_seconds = sum(timings[name] for name in market_names) + time.perf_counter() - t0
+            final_preds = meta_model.predict(test_meta)
+            if market == "moneyline":
+                metrics = {
+                    "accuracy": accuracy_score(y_test[market], final_preds),
+                    "auc": roc_auc_score(y_test[market], final_preds),
+                    "f1": f1_score(y_test[market], final_preds),
+                }
+                meta_name = "meta_stacker"
+            else:
+                metrics = _regression_metrics(y_test[market], final_preds)
+                if market == "margin":
+                    # margin sign as a winner pick, comparable with the moneyline accuracy
+                    metrics["winner_accuracy"] = float(np.mean((final_preds > 0) == (y_test[market] > 0)))
+                meta_name = f"{market}_meta"
+            models[meta_name] = meta_model
+            joblib.dump(meta_model, os.path.join(version_dir, f"{meta_name}.pkl"))
+            report[market] = {**metrics, "fit_seconds": fit_seconds}
+        # all three markets from one batched pass over the test rows
+        markets = {market: {"base": names[market], "meta": f"{market}_meta"} for market in MARKET_SPECS}
+        scorer = FusedScorer(models, scaler, markets)
+        scorer.predict_markets(X_raw[n_train:])
+        for market, seconds in scorer.last_timings.items():
+            report[market]["predict_ms"] = seconds * 1000
 
-    print(f"✅ Stacked Model Results → ACC:{acc:.3f}  AUC:{auc:.3f}  F1:{f1:.3f}")
-    joblib.dump(meta_model, os.path.join(models_dir, "meta_stacker.pkl"))
-    joblib.dump(scaler, os.path.join(models_dir, "scaler.pkl"))
-    print(f"Models saved in {models_dir}.")
-    return acc, auc, f1
+        ml = report["moneyline"]
+        print(f"✅ Stacked Model Results → ACC:{ml['accuracy']:.3f}  AUC:{ml['auc']:.3f}  F1:{ml['f1']:.3f}")
+        for market in MARKET_SPECS:
+            print(f"✅ {market.capitalize()} → MAE:{report[market]['mae']:.2f}  RMSE:{report[market]['rmse']:.2f}")
+        joblib.dump(scaler, os.path.join(version_dir, "scaler.pkl"))
+        save_feature_list(version_dir, MODEL_FEATURES)
+        save_markets(version_dir, markets, report)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    publish_version(version_dir, models_dir)
+    progress(1.0, "Published")
+    print(f"Models saved in {version_dir} (now current).")
+    return report
@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+from game_store import season_start
+
+ELO_BASE = 1500.0
+ELO_K = 20.0
+HOME_ADVANTAGE = 100.0   # Elo points added to the home side
+SEASON_CARRY = 0.75      # share of a team's distance from the mean kept into a new season
+MASSEY_RIDGE = 2.0       # pulls early-season Massey ratings toward 0 (keeps the solve well posed)
+
+# per team-game row: own and opponent ratings before tip-off, and the Elo win expectancy
+RATING_FEATURES = ["elo", "opp_elo", "elo_win_prob", "massey", "opp_massey"]
+
+
+def elo_expected(diff):
+    return 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+
+def mov_multiplier(margin, winner_diff):
+    """Margin-of-victory scaling, damped when the favourite wins (FiveThirtyEight's NBA form)."""
+    return (abs(margin) + 3.0) ** 0.8 / (7.5 + 0.006 * winner_diff)
+
+
+class RatingState:
+    """
+    Streaming team ratings, updated one final score at a time in date order.
+    Elo uses home-court advantage and margin-of-victory scaling, and teams
+    regress toward the mean between seasons. The optional Massey rating is a
+    ridge least-squares fit of the current season's margins, refit once each
+    time the date moves on, so it always reflects the games before the
+    current date.
+    """
+
+    def __init__(self, massey=True, k=ELO_K, home_advantage=HOME_ADVANTAGE,
+                 carry=SEASON_CARRY, ridge=MASSEY_RIDGE):
+        self.massey_enabled = massey
+        self.k = k
+        self.home_advantage = home_advantage
+        self.carry = carry
+        self.ridge = ridge
+        self.elo = {}
+        self.massey = {}
+        self.season = None
+        self.current_date = None
+        self._index = {}                 # team -> slot in the season accumulators
+        self._gram = np.zeros((0, 0))    # games-played matrix of this season
+        self._margin = np.zeros(0)       # summed point differential of this season
+        self._dirty = False
+
+    def _slot(self, team):
+        idx = self._index.get(team)
+        if idx is None:
+            idx = self._index[team] = len(self._index)
+            if idx >= len(self._margin):
+                size = max(32, 2 * len(self._margin))
+                gram = np.zeros((size, size))
+                gram[:len(self._margin), :len(self._margin)] = self._gram
+                self._gram = gram
+                self._margin = np.r_[self._margin, np.zeros(size - len(self._margin))]
+        return idx
+
+    def refit(self):
+        """Solve the Massey system over this season's games applied so far."""
+        if self._dirty:
+            n = len(self._index)
+            ratings = np.linalg.solve(self._gram[:n, :n] + self.ridge * np.eye(n), self._margin[:n])
+            self.massey = dict(zip(self._index, ratings.tolist()))
+            self._dirty = False
+
+    def advance(self, date_str):
+        """Move to a (later) date: regress Elo at a season change, otherwise refit Massey."""
+        if self.current_date is not None and date_str <= self.current_date:
+            return
+        season = season_start(date_str)
+        if self.season is not None and season != self.season:
+            self.elo = {t: ELO_BASE + self.carry * (r - ELO_BASE) for t, r in self.elo.items()}
+            self.massey = {}
+            self._index = {}
+            self._gram = np.zeros((0, 0))
+            self._margin = np.zeros(0)
+            self._dirty = False
+        elif self.massey_enabled:
+            self.refit()
+        self.season = season
+        self.current_date = date_str
+
+    def apply_game(self, date_str, home_team, away_team, home_score, away_score):
+        self.advance(date_str)
+        if home_team == away_team:
+            return
+        home_elo = self.elo.get(home_team, ELO_BASE)
+        away_elo = self.elo.get(away_team, ELO_BASE)
+        diff = home_elo + self.home_advantage - away_elo
+        margin = home_score - away_score
+        home_won = margin > 0
+        winner_diff = diff if home_won else -diff
+        shift = self.k * mov_multiplier(margin, winner_diff) * (float(home_won) - elo_expected(diff))
+        self.elo[home_team] = home_elo + shift
+        self.elo[away_team] = away_elo - shift
+
+        if self.massey_enabled:
+            i, j = self._slot(home_team), self._slot(away_team)
+            self._gram[i, i] += 1
+            self._gram[j, j] += 1
+            self._gram[i, j] -= 1
+            self._gram[j, i] -= 1
+            self._margin[i] += margin
+            self._margin[j] -= margin
+            self._dirty = True
+
+    def _lookups(self, as_of=None):
+        """
+        (elo, massey) getters as a game on YYYYMMDD `as_of` sees them. A date
+        in a later season gets what advance() would produce (Elo regressed
+        toward the mean, no Massey fit yet) without changing the state.
+        """
+        if as_of is not None and self.season is not None and season_start(as_of) > self.season:
+            elo, carry = self.elo, self.carry
+            return (lambda t: ELO_BASE + carry * (elo.get(t, ELO_BASE) - ELO_BASE)), (lambda t: 0.0)
+        self.refit()
+        elo, massey = self.elo, self.massey
+        return (lambda t: elo.get(t, ELO_BASE)), (lambda t: massey.get(t, 0.0))
+
+    def team_ratings(self, team, as_of=None):
+        """(elo, massey) of a team for a game on `as_of` (default: now), for serving live features."""
+        elo, massey = self._lookups(as_of)
+        return elo(team), massey(team)
+
+    def _rows(self, elo, massey, team, opponent, is_home):
+        own, opp = elo(team), elo(opponent)
+        side = self.home_advantage if is_home else -self.home_advantage
+        return own, opp, elo_expected(own - opp + side), massey(team), massey(opponent)
+
+    def matchup_ratings(self, home_teams, away_teams, as_of=None):
+        """RATING_FEATURES rows for matchups on `as_of`: every home-team row, then every away-team row."""
+        elo, massey = self._lookups(as_of)
+        rows = [self._rows(elo, massey, h, a, True) for h, a in zip(home_teams, away_teams)]
+        rows += [self._rows(elo, massey, a, h, False) for h, a in zip(home_teams, away_teams)]
+        return np.array(rows, dtype=float).reshape(len(rows), len(RATING_FEATURES))
+
+    def to_dict(self):
+        n = len(self._index)
+        return {
+            "params": [self.massey_enabled, self.k, self.home_advantage, self.carry, self.ridge],
+            "elo": self.elo, "massey": self.massey,
+            "season": self.season, "current_date": self.current_date,
+            "index": list(self._index), "gram": self._gram[:n, :n].tolist(),
+            "margin": self._margin[:n].tolist(), "dirty": self._dirty,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(*data["params"])
+        state.elo = dict(data["elo"])
+        state.massey = dict(data["massey"])
+        state.season = data["season"]
+        state.current_date = data["current_date"]
+        for team in data["index"]:
+            state._slot(team)
+        n = len(state._index)
+        if n:
+            state._gram[:n, :n] = np.asarray(data["gram"])
+            state._margin[:n] = np.asarray(data["margin"])
+        state._dirty = data["dirty"]
+        return state
+
+
+def _date_strings(dates):
+    dates = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dates = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return dates.astype(str).to_numpy()
+
+
+def pregame_ratings(games, state=None):
+    """
+    One chronological pass over scored games. Returns (ratings, state):
+    ratings is aligned with `games` and holds home_elo / away_elo /
+    home_massey / away_massey before each game; state is left after the
+    last game (pass it back in to continue with newer games).
+    """
+    state = state or RatingState()
+    dates = _date_strings(games["date"]).tolist()
+    home = games["home_team"].astype(str).tolist()
+    away = games["away_team"].astype(str).tolist()
+    home_score = games["home_score"].astype(float).tolist()
+    away_score = games["away_score"].astype(float).tolist()
+    out = [None] * len(dates)
+    for i in np.argsort(dates, kind="stable").tolist():
+        state.advance(dates[i])
+        elo, massey = state.elo, state.massey
+        h, a = home[i], away[i]
+        out[i] = (elo.get(h, ELO_BASE), elo.get(a, ELO_BASE), massey.get(h, 0.0), massey.get(a, 0.0))
+        state.apply_game(dates[i], h, a, home_score[i], away_score[i])
+    out = np.array(out, dtype=float).reshape(len(dates), 4)
+    ratings = pd.DataFrame(out, columns=["home_elo", "away_elo", "home_massey", "away_massey"], index=games.index)
+    return ratings, state
+
+
+def team_rating_features(is_home, own_elo, opp_elo, own_massey, opp_massey, home_advantage=HOME_ADVANTAGE):
+    """RATING_FEATURES columns for team-perspective rows (arrays), as served live by RatingState."""
+    side = np.where(np.asarray(is_home) == 1, home_advantage, -home_advantage)
+    return pd.DataFrame({
+        "elo": own_elo, "opp_elo": opp_elo,
+        "elo_win_prob": 1.0 / (1.0 + 10.0 ** (-(own_elo - opp_elo + side) / 400.0)),
+        "massey": own_massey, "opp_massey": opp_massey,
+    })
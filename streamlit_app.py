@@ -1,12 +1,30 @@
-import os, sys, streamlit as st, pandas as pd
-import data_fetcher as df
-from data_saver import collect_season_data
-import model_predictor as mp
-import model_trainer as trainer
+import os, sys, time, streamlit as st
+from contextlib import contextmanager
 
 file_dir = os.path.dirname(__file__)
 sys.path.append(file_dir)
 
+# Only streamlit loads before the title paints. The data layer is imported
+# below it; xgboost/sklearn (trainer, backtest) load when their button is
+# pressed, and the live models load in the poller's background thread.
+HISTORY_TTL = 600   # seconds the past-week table (and team-state top-up) is reused across reruns
+SNAPSHOT_WAIT = 10  # seconds a cold session waits for the poller's first board / predictions
+JOB_REFRESH = 2     # seconds between refreshes of a queued/running job's panel
+LOG_TAIL = 40       # job log lines shown under a job panel
+run_start = time.perf_counter()
+page_timing = {}
+
+
+@contextmanager
+def timed(section):
+    """Add a section's wall time (ms) to the page timing report at the bottom."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        page_timing[section] = (time.perf_counter() - t0) * 1000
+
+
 st.set_page_config(page_title="🏀 NBA Prediction System", layout="wide")
 
 st.title("🏀 NBA Prediction System — Real Data + Machine Learning Forecasts")
@@ -19,39 +37,92 @@ using a **stacked ensemble (XGBoost + Random Forest + Logistic Regress
 # 1. LIVE / UPCOMING GAMES
 # -------------------------------
 st.subheader("🏟️ Live / Upcoming Games (ESPN Feed)")
-live_games = df.get_live_scoreboard()
-if live_games.empty:
-    st.info("No live or upcoming NBA games right now.")
-else:
-    st.dataframe(live_games, use_container_width=True)
+with timed("data layer import"):
+    import pandas as pd
+    import data_fetcher as df
+    import game_store
+    import model_predictor as mp
+    from live_poller import LivePoller, POLL_INTERVAL
+    import job_runner
+
+
+@st.cache_resource
+def live_poller():
+    """One background scoreboard poller per server process, shared by every session."""
+    return LivePoller().start()
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def live_board():
+    snap = poller.snapshot(timeout=SNAPSHOT_WAIT)
+    if snap is None or snap["games"].empty:
+        st.info("No live or upcoming NBA games right now.")
+    else:
+        st.dataframe(snap["games"], use_container_width=True)
+        st.caption(f"Updated {snap['updated_at']:%H:%M:%S} · refreshes every {POLL_INTERVAL}s")
+
+
+with timed("live board"):
+    poller = live_poller()
+    live_board()
 
 # -------------------------------
 # 2. HISTORICAL SCORES
 # -------------------------------
 st.subheader("📚 Past Week Final Scores (ESPN)")
-past_games = df.get_historical_games()
+@st.cache_data(ttl=HISTORY_TTL, show_spinner="Loading the past week of scores...")
+def past_week_games():
+    """Finals of the last 7 days, fetched once per HISTORY_TTL; returns (games, team-state error)."""
+    games = df.get_historical_games()
+    try:
+        # keep the live team state (rolling features for predictions) current
+        mp.update_team_state(games)
+    except Exception as e:
+        return games, str(e)
+    return games, None
+
+
+with timed("past week"):
+    past_games, state_error = past_week_games()
+if state_error:
+    st.warning(f"Team state update skipped: {state_error}")
 if past_games.empty:
     st.info("No final score data available right now.")
 else:
     st.dataframe(past_games, use_container_width=True)
+cache = df.cache_stats()
+st.caption(f"ESPN cache · {cache['memory_hits'] + cache['disk_hits'] + cache['shared']} hits / {cache['misses']} network calls · {cache['cached_boards']} boards held")
 
 # -------------------------------
 # 3. DATASET COLLECTION
 # -------------------------------
 st.subheader("🗂️ Collect and Save Full Dataset (3‑5 Seasons)")
 seasons_back = st.slider("How many seasons to collect ?", 3, 5, 5)
+has_dataset = game_store.has_games() or os.path.exists(game_store.LEGACY_GAMES_CSV)
+collect_mode = st.radio(
+    "Collection mode",
+    ["Incremental update (new days only)", "Full re-download"],
+    index=0 if has_dataset else 1,
+    horizontal=True,
+)
 
 if st.button("Collect Dataset"):
     progress_bar = st.progress(0.0)
     def prog_cb(frac):
         progress_bar.progress(frac)
+    from data_saver import collect_season_data, update_season_data
     with st.spinner("Collecting multi‑season data..."):
-        dataset = collect_season_data(seasons_back, progress_cb=prog_cb)
+        if collect_mode.startswith("Incremental"):
+            dataset = update_season_data(progress_cb=prog_cb, seasons_back=seasons_back)
+        else:
+            dataset = collect_season_data(seasons_back, progress_cb=prog_cb)
     progress_bar.empty()
     if not dataset.empty:
+        # new or backfilled games reach the live team state now, not at the next restart
+        mp.refresh_team_state()
         st.success(f"Data saved — {len(dataset)} games ✅")
         st.dataframe(dataset, use_container_width=True)
-        csv_bytes = dataset.to_csv(index=False).encode("utf-8")
+        csv_bytes = game_store.to_csv_bytes(dataset)
         st.download_button(
             "⬇️ Download Full Dataset (CSV)",
             csv_bytes,
@@ -65,36 +136,154 @@ if st.button("Collect Dataset"):
 # 4. BUILD FEATURES (NEW SECTION)
 # -------------------------------
 st.subheader("🧮 Build Features From Dataset")
+@st.fragment(run_every=JOB_REFRESH)
+def job_progress(job_id):
+    """Polls one queued/running job's state file; hands over to a full rerun once it finishes."""
+    job = job_runner.load_job(job_id)
+    if job["status"] not in job_runner.ACTIVE:
+        st.rerun()
+    if job["status"] == "queued":
+        st.progress(0.0, text="Queued ⏳")
+    else:
+        st.progress(job["progress"], text=f"{job['message']} · {job['progress'] * 100:.0f}%")
+        if job["kind"] == "train":
+            st.caption(f"Predictions keep serving model version {mp.REGISTRY.version} until the new one is published.")
+    with st.expander(f"Job log · {job['id']} ({job['status']})"):
+        st.code(job_runner.read_log(job["id"], tail=LOG_TAIL) or "(no output yet)")
+
+
+def job_panel(kind):
+    """
+    Latest background job of `kind`: a polling progress fragment while it is
+    queued/running, a static outcome (no polling) once it has finished.
+    """
+    job = job_runner.latest_job(kind)
+    if job is None:
+        return
+    if job["status"] in job_runner.ACTIVE:
+        job_progress(job["id"])
+        return
+    if job["status"] == "failed":
+        st.error(f"Job {job['id']} failed: {job['error']}")
+    elif kind == "train":
+        report = job["result"]
+        ml = report["moneyline"]
+        st.success(f"Models trained and saved ✅ ACC:{ml['accuracy']:.2f} AUC:{ml['auc']:.2f} F1:{ml['f1']:.2f} · "
+                   f"margin MAE:{report['margin']['mae']:.1f} · total MAE:{report['total']['mae']:.1f}")
+        st.dataframe(pd.DataFrame(report).T.rename_axis("market"), use_container_width=True)
+    else:
+        st.success(f"Features built ({job['result']['rows']} rows) and saved to the feature store ✅")
+        st.download_button(
+            "⬇️ Download Features (CSV)",
+            lambda: game_store.to_csv_bytes(game_store.read_features()),
+            file_name="features_ready.csv",
+            mime="text/csv"
+        )
+    took = f", {job['finished_at'] - job['started_at']:.0f}s" if job["finished_at"] and job["started_at"] else ""
+    with st.expander(f"Job log · {job['id']} ({job['status']}{took})"):
+        st.code(job_runner.read_log(job["id"], tail=LOG_TAIL) or "(no output yet)")
+
+
 if st.button("Build Features File"):
-    with st.spinner("Building model-ready features..."):
-        feats = trainer.build_features()
-    st.success(f"Features file created ({len(feats)} rows) and saved as data/features_ready.csv ✅")
-    st.dataframe(feats.head(25), use_container_width=True)
+    job_runner.submit("build_features")
+job_panel("build_features")
 
 # -------------------------------
 # 5. TRAIN / RETRAIN MODELS
 # -------------------------------
 st.subheader("⚙️ Training / Retraining the Stacked Ensemble Model")
-if st.button("Retrain Models"):
-    with st.spinner("Training ensemble (XGB + RF + LR + Meta XGB)... ⏳"):
-        acc, auc, f1 = trainer.train_stacked_model()
-    st.success(f"Models trained and saved ✅ ACC:{acc:.2f} AUC:{auc:.2f} F1:{f1:.2f}")
+if st.button("Retrain Models"):
+    if job_runner.active_job("train"):
+        st.info("A training job is already queued or running — following it below.")
+    job_runner.submit("train")
+job_panel("train")
+
+# -------------------------------
+# 5b. WALK-FORWARD BACKTEST
+# -------------------------------
+st.subheader("📈 Walk-forward Backtest")
+bt_freq = st.selectbox("Test period", ["W", "M", "season"],
+                       format_func={"W": "Weekly", "M": "Monthly", "season": "Per season"}.get)
+bt_mode = st.radio("Training window", ["expanding", "rolling"], horizontal=True)
+if st.button("Run Backtest"):
+    try:
+        import backtest
+        with st.spinner("Walking forward through the history... ⏳"):
+            bt = backtest.walk_forward_backtest(freq=bt_freq, mode=bt_mode)
+        if bt.empty:
+            st.warning("Not enough history for a backtest yet.")
+        else:
+            st.line_chart(bt.set_index("period_start")[["accuracy", "auc", "log_loss"]])
+            st.dataframe(bt, use_container_width=True)
+            st.success(f"Backtest done ✅ {len(bt)} periods · mean ACC:{bt['accuracy'].mean():.3f} "
+                       f"mean log-loss:{bt['log_loss'].mean():.3f}")
+    except Exception as e:
+        st.error(f"Backtest error: {e}")
 
 # -------------------------------
 # 6. PREDICTIONS
 # -------------------------------
 st.subheader("🤖 Predictions — Today’s Games (Moneyline Forecast)")
-try:
-    if live_games.empty:
+@st.fragment(run_every=POLL_INTERVAL)
+def live_predictions():
+    snap = poller.snapshot(timeout=SNAPSHOT_WAIT, scored=True)
+    if snap is None or snap["games"].empty:
         st.info("No games available for prediction right now.")
+    elif snap["pending"]:
+        st.info("Loading the models and scoring today's games... ⏳")
+    elif snap["predictions"].empty:
+        st.warning("Prediction skipped — models might be missing. Train first above 👆")
+        if snap["error"]:
+            st.error(f"Prediction error: {snap['error']}")
     else:
-        preds = mp.predict_today(live_games)
-        if preds.empty:
-            st.warning("Prediction skipped — models might be missing. Train first above 👆")
-        else:
-            st.dataframe(preds, use_container_width=True)
-            st.success("Predictions generated ✅")
-except Exception as e:
-    st.error(f"Prediction error: {e}")
+        st.dataframe(snap["predictions"], use_container_width=True)
+        st.success("Predictions generated ✅")
+        m = mp.REGISTRY.metrics
+        last_predict = m["last_predict_seconds"]
+        st.caption(
+            f"Model version {mp.REGISTRY.version} · loaded {m['loads']}× · "
+            f"last predict {last_predict * 1000 if last_predict else 0:.1f} ms · "
+            f"{poller.stats['predicted_games']} games predicted over {poller.stats['polls']} polls"
+        )
+
+
+with timed("predictions"):
+    live_predictions()
+
+st.markdown("**🔮 What-if matchup**")
+@st.fragment
+def what_if():
+    """Team pickers rerun only this fragment; every pair is precomputed in the matchup matrix."""
+    try:
+        matrix = mp.get_matchup_matrix()
+        wi_home, wi_away = st.columns(2)
+        teams = matrix.known_teams
+        home_pick = wi_home.selectbox("Home team", teams, index=0)
+        away_pick = wi_away.selectbox("Away team", teams, index=min(1, len(teams) - 1))
+        p_home = matrix.home_win_prob(home_pick, away_pick)
+        wi_cols = st.columns(3)
+        wi_cols[0].metric(f"{home_pick} win probability vs {away_pick}", f"{p_home * 100:.1f}%")
+        picked = matrix.lookup_markets([home_pick], [away_pick])
+        if "margin" in picked:
+            wi_cols[1].metric(f"{home_pick} margin", f"{picked['margin'][0]:+.1f}")
+            wi_cols[2].metric("Total points", f"{picked['total'][0]:.1f}")
+    except FileNotFoundError:
+        st.info("Train the models above to explore hypothetical matchups.")
+    except Exception as e:
+        st.error(f"Matchup matrix error: {e}")
+
+
+with timed("what-if"):
+    what_if()
 
 st.caption("Data from ESPN public feeds | Models trained with real multi-season NBA data.")
+
+# -------------------------------
+# 7. PAGE TIMING
+# -------------------------------
+page_timing["total"] = (time.perf_counter() - run_start) * 1000
+st.session_state["page_timing"] = page_timing
+first_run = st.session_state.setdefault("first_page_timing", dict(page_timing))
+with st.expander("⏱️ Page timing"):
+    st.caption("This run: " + " · ".join(f"{k} {v:.0f} ms" for k, v in page_timing.items()))
+    st.caption("First run of this session: " + " · ".join(f"{k} {v:.0f} ms" for k, v in first_run.items()))
@@ -0,0 +1,227 @@
+import json
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import game_store
+from feature_engineering import WINDOWS, feature_columns, model_features, usable_games
+from ratings import RatingState
+
+STATE_PATH = os.path.join(game_store.DATA_DIR, "team_state.json")
+
+# served for a team with no history yet (the old prediction placeholders)
+DEFAULT_STATS = {"pts": 111.0, "pa": 108.0, "win": 0.55}
+
+
+def _date_str(date):
+    return None if date is None else pd.Timestamp(date).strftime("%Y%m%d")
+
+
+class _TeamBuffer:
+    """Ring buffers of one team's last N results with running sums per window."""
+
+    __slots__ = ("pf", "pa", "win", "sums")
+
+    def __init__(self, maxlen, windows):
+        self.pf = deque(maxlen=maxlen)
+        self.pa = deque(maxlen=maxlen)
+        self.win = deque(maxlen=maxlen)
+        self.sums = {n: [0, 0, 0] for n in windows}
+
+    def push(self, points_for, points_against):
+        win = int(points_for > points_against)
+        size = len(self.pf)
+        for n, s in self.sums.items():
+            # drop the result that slides out of this window
+            if size >= n:
+                s[0] -= self.pf[-n]
+                s[1] -= self.pa[-n]
+                s[2] -= self.win[-n]
+            s[0] += points_for
+            s[1] += points_against
+            s[2] += win
+        self.pf.append(points_for)
+        self.pa.append(points_against)
+        self.win.append(win)
+
+    def stats(self, n):
+        count = min(len(self.pf), n)
+        if count == 0:
+            return None
+        s = self.sums[n]
+        return s[0] / count, s[1] / count, s[2] / count
+
+
+class TeamState:
+    """
+    Online per-team rolling state for live prediction features.
+    Each final score updates the team's buffers in O(1); features for any
+    team/matchup are served from the running sums and equal the batch
+    build_features values for a game dated after the last applied result.
+    Pre-game Elo/Massey ratings stream alongside in `ratings`.
+    """
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = tuple(windows)
+        self.maxlen = max(self.windows)
+        self.teams = {}
+        self.last_date = None
+        self._seen = set()
+        self.ratings = RatingState()
+
+    @property
+    def applied(self):
+        """Number of distinct games applied so far."""
+        return len(self._seen)
+
+    def _buffer(self, team):
+        buf = self.teams.get(team)
+        if buf is None:
+            buf = self.teams[team] = _TeamBuffer(self.maxlen, self.windows)
+        return buf
+
+    def apply_game(self, date, home_team, away_team, home_score, away_score):
+        """Apply one final score; returns False if the game was already applied."""
+        date = pd.Timestamp(date).strftime("%Y%m%d")
+        key = f"{date}|{home_team}|{away_team}"
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        home_score, away_score = int(home_score), int(away_score)
+        self._buffer(home_team).push(home_score, away_score)
+        if away_team != home_team:
+            self._buffer(away_team).push(away_score, home_score)
+        self.ratings.apply_game(date, home_team, away_team, home_score, away_score)
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+        return True
+
+    def update_from_games(self, games, cutoff=None):
+        """
+        Apply final games (store frame or ESPN fetch frame) in date order,
+        optionally only those dated before `cutoff`. Returns the number applied.
+        """
+        if games is None or len(games) == 0:
+            return 0
+        games = game_store.normalize_games(games)
+        games = usable_games(games)
+        if cutoff is not None:
+            games = games[games["date"] < pd.Timestamp(cutoff)]
+        games = games.sort_values("date", kind="stable")
+        applied = 0
+        for row in games[["date", "home_team", "away_team", "home_score", "away_score"]].itertuples(index=False):
+            applied += self.apply_game(*row)
+        return applied
+
+    def team_features(self, team, is_home):
+        """Model feature dict for `team` playing at home (1) or away (0)."""
+        feats = {"is_home": int(is_home)}
+        buf = self.teams.get(team)
+        for n in self.windows:
+            stats = buf.stats(n) if buf is not None else None
+            if stats is None:
+                stats = DEFAULT_STATS["pts"], DEFAULT_STATS["pa"], DEFAULT_STATS["win"]
+            feats[f"avg_pts_{n}"], feats[f"avg_pa_{n}"], feats[f"win_rate_{n}"] = stats
+        return feats
+
+    def team_signature(self, team, as_of=None):
+        """Everything a team's prediction rows for a game on `as_of` depend on (rolling stats and ratings)."""
+        return (tuple(self.team_features(team, 1).values()), tuple(self.team_features(team, 0).values()),
+                self.ratings.team_ratings(team, _date_str(as_of)))
+
+    def matchup_features(self, home_teams, away_teams, as_of=None):
+        """
+        Feature frame for a list of matchups played on `as_of` (ratings carry
+        over into a new season as in the batch build; default: the state as
+        of the last applied game): the home team's row (is_home=1) for every
+        game, followed by the away team's row (is_home=0), with the rolling
+        columns followed by the rating columns.
+        """
+        home_teams, away_teams = list(home_teams), list(away_teams)
+        columns = feature_columns(self.windows)
+        cache = {}
+
+        def _row(team, is_home):
+            row = cache.get((team, is_home))
+            if row is None:
+                feats = self.team_features(team, is_home)
+                row = cache[(team, is_home)] = [feats[c] for c in columns]
+            return row
+
+        rolling = [_row(t, 1) for t in home_teams] + [_row(t, 0) for t in away_teams]
+        values = np.hstack([np.array(rolling, dtype=float).reshape(len(rolling), len(columns)),
+                            self.ratings.matchup_ratings(home_teams, away_teams, _date_str(as_of))])
+        return pd.DataFrame(values, columns=model_features(self.windows))
+
+    def to_dict(self):
+        return {
+            "windows": list(self.windows),
+            "last_date": self.last_date,
+            "seen": sorted(self._seen),
+            "teams": {t: {"pf": list(b.pf), "pa": list(b.pa)} for t, b in self.teams.items()},
+            "ratings": self.ratings.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(windows=data["windows"])
+        for team, hist in data["teams"].items():
+            buf = state._buffer(team)
+            for pf, pa in zip(hist["pf"], hist["pa"]):
+                buf.push(pf, pa)
+        state.last_date = data["last_date"]
+        state._seen = set(data["seen"])
+        # states saved before ratings existed raise KeyError and are rebuilt from the store
+        state.ratings = RatingState.from_dict(data["ratings"])
+        return state
+
+    def save(self, path=STATE_PATH):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def sync_team_state(state, path=STATE_PATH, store_dir=game_store.STORE_DIR):
+    """
+    Apply the store's final games that `state` has not seen yet (matched by
+    game key, not by date). If any of them predate the last applied game (a
+    gap backfilled after the past-week feed moved last_date ahead), the state
+    is rebuilt from the store instead, so it matches the batch build. Saves
+    and returns the (possibly new) state.
+    """
+    games = game_store.read_games(store_dir=store_dir)
+    if games is None:
+        return state
+    games = usable_games(game_store.normalize_games(games))
+    days = np.datetime_as_string(games["date"].values, unit="D").tolist()
+    unseen = games[[f"{d[:4]}{d[5:7]}{d[8:]}|{h}|{a}" not in state._seen
+                    for d, h, a in zip(days, games["home_team"].tolist(), games["away_team"].tolist())]]
+    if unseen.empty:
+        return state
+    if state.last_date is not None and unseen["date"].min() < pd.Timestamp(state.last_date):
+        print(f"Rebuilding the team state: the store has {len(unseen)} unseen game(s) before {state.last_date}")
+        state, unseen = TeamState(state.windows), games
+    state.update_from_games(unseen)
+    state.save(path)
+    return state
+
+
+def load_team_state(path=STATE_PATH, store_dir=game_store.STORE_DIR, windows=WINDOWS):
+    """Persisted state brought up to date with the game store (see sync_team_state)."""
+    state = None
+    if os.path.exists(path):
+        try:
+            state = TeamState.load(path)
+        except (ValueError, KeyError):
+            state = None
+    if state is None or state.windows != tuple(windows):
+        state = TeamState(windows)
+    return sync_team_state(state, path, store_dir)
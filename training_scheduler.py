@@ -0,0 +1,158 @@
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+
+CACHE_DIR = os.path.join("models", "cache")
+# take n_jobs but ignore it (sklearn >= 1.8 warns on every fit when it is set)
+IGNORES_N_JOBS = {"LogisticRegression"}
+
+
+def mp_context():
+    # never fork a process that may already hold OpenMP/xgboost threads
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def make_estimator(estimator_cls, params, n_jobs=None):
+    """Fresh estimator; n_jobs is set for every model that has the parameter and uses it."""
+    params = dict(params)
+    if (n_jobs is not None and estimator_cls.__name__ not in IGNORES_N_JOBS
+            and "n_jobs" in estimator_cls().get_params()):
+        params["n_jobs"] = n_jobs
+    return estimator_cls(**params)
+
+
+def predict_scores(model, X):
+    """P(class 1) for classifiers, plain predictions for regressors."""
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, 1]
+    return model.predict(X)
+
+
+def fit_fold(estimator_cls, params, n_jobs, X_train, y_train, train_idx, val_idx, X_test, keep_model):
+    """
+    One (model, fold) fit: returns the out-of-fold predictions for val_idx,
+    the fit time and, for the fold whose model is kept, test-set predictions
+    and the fitted model.
+    """
+    model = make_estimator(estimator_cls, params, n_jobs)
+    t0 = time.perf_counter()
+    model.fit(X_train[train_idx], y_train[train_idx])
+    seconds = time.perf_counter() - t0
+    oof = predict_scores(model, X_train[val_idx])
+    if not keep_model:
+        return oof, None, None, seconds
+    return oof, predict_scores(model, X_test), model, seconds
+
+
+def oof_cache_key(name, estimator_cls, params, X_train, y_train, X_test, folds):
+    """Hash of the training data, the hyperparameters and the fold split."""
+    h = hashlib.sha256()
+    for arr in (X_train, y_train, X_test):
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.tobytes())
+    h.update(f"{name}|{estimator_cls.__module__}.{estimator_cls.__name__}|{sorted(params.items())!r}".encode())
+    for train_idx, val_idx in folds:
+        h.update(val_idx.tobytes())
+    return h.hexdigest()[:32]
+
+
+def _prune_cache(cache_dir, keep):
+    entries = sorted((os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".joblib")),
+                     key=os.path.getmtime)
+    for path in entries[:max(0, len(entries) - keep)]:
+        os.remove(path)
+
+
+def run_base_models(specs, X_train, y_train, X_test, folds, cache_dir=CACHE_DIR,
+                    max_workers=None, keep_cache=12, targets=None, timings=None, progress_cb=None):
+    """
+    Out-of-fold stacking for every (name, estimator_cls, params) in `specs`.
+    Independent (model, fold) fits run in a process pool with a per-fit core
+    budget of cpu_count // workers; results for a model whose data,
+    hyperparameters and folds are unchanged come from the OOF cache.
+    `targets` maps a spec name to its own target vector (default `y_train`),
+    so models for several markets share one pool, feature matrix and fold split.
+    As in the sequential loop, the model kept per base learner (and used for
+    the test predictions) is the one fitted on the last fold. `timings`, if
+    given, receives the summed fit seconds per name (0 for cache hits).
+    `progress_cb(fraction, message)` is called after every (model, fold) fit.
+    Returns {name: (oof_preds, test_preds, model)}.
+    """
+    folds = list(folds)
+    targets = targets or {}
+    timings = {} if timings is None else timings
+    results = {}
+    todo = []
+    keys = {}
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    for name, estimator_cls, params in specs:
+        y = targets.get(name, y_train)
+        key = oof_cache_key(name, estimator_cls, params, X_train, y, X_test, folds)
+        path = os.path.join(cache_dir, f"{name}-{key}.joblib") if cache_dir else None
+        if path and os.path.exists(path):
+            print(f"Base model {name}: out-of-fold cache hit")
+            results[name] = joblib.load(path)
+            timings[name] = 0.0
+            os.utime(path)
+        else:
+            keys[name] = path
+            todo.append((name, estimator_cls, params))
+
+    tasks = [(name, cls, params, fold_no, train_idx, val_idx)
+             for name, cls, params in todo
+             for fold_no, (train_idx, val_idx) in enumerate(folds)]
+    if tasks:
+        cpus = os.cpu_count() or 1
+        workers = max(1, min(len(tasks), max_workers or cpus))
+        n_jobs = max(1, cpus // workers)
+        oof = {name: np.zeros(X_train.shape[0]) for name, _, _ in todo}
+        kept = {}
+        last_fold = len(folds) - 1
+        done = [0]
+        print(f"Training {len(todo)} base models × {len(folds)} folds "
+              f"on {workers} worker(s), {n_jobs} core(s) per fit")
+
+        def _collect(task, result):
+            name, _, _, fold_no, _, val_idx = task
+            fold_oof, test_pred, model, seconds = result
+            oof[name][val_idx] = fold_oof
+            timings[name] = timings.get(name, 0.0) + seconds
+            if fold_no == last_fold:
+                kept[name] = (test_pred, model)
+            print(f"  {name} fold {fold_no + 1}/{len(folds)} done")
+            done[0] += 1
+            if progress_cb:
+                progress_cb(done[0] / len(tasks), f"{name} fold {fold_no + 1}/{len(folds)}")
+
+        if workers == 1:
+            for task in tasks:
+                name, cls, params, fold_no, train_idx, val_idx = task
+                _collect(task, fit_fold(cls, params, n_jobs, X_train, targets.get(name, y_train),
+                                        train_idx, val_idx, X_test, fold_no == last_fold))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context()) as pool:
+                futures = {}
+                for task in tasks:
+                    name, cls, params, fold_no, train_idx, val_idx = task
+                    fut = pool.submit(fit_fold, cls, params, n_jobs, X_train, targets.get(name, y_train),
+                                      train_idx, val_idx, X_test, fold_no == last_fold)
+                    futures[fut] = task
+                for fut in as_completed(futures):
+                    _collect(futures[fut], fut.result())
+
+        for name, _, _ in todo:
+            test_pred, model = kept[name]
+            results[name] = (oof[name], test_pred, model)
+            if keys[name]:
+                joblib.dump(results[name], keys[name])
+        if cache_dir:
+            _prune_cache(cache_dir, keep_cache)
+    return {name: results[name] for name, _, _ in specs}